@@ -1,6 +1,7 @@
 # algo_trading_system/brokers/zerodha/kite_connect.py
 import json
 import os
+import time
 from kiteconnect import KiteApp
 from kiteconnect.exceptions import KiteException, TokenException, NetworkException, GeneralException, InputException
 # Assuming config is accessible
@@ -13,6 +14,9 @@ except ImportError:
     ZERODHA_API_SECRET = None
     ZERODHA_ACCESS_TOKEN_FILE = "logs/zerodha_access_token.json"
 
+# Kite access tokens are day-scoped; older stored tokens are not worth a validation round-trip
+TOKEN_MAX_AGE_SECONDS = 8 * 3600
+
 
 class KiteConnectAPI:
     def __init__(self, api_key=None, access_token=None, user_id_for_logging=None, logger=None):
@@ -43,9 +47,13 @@ class KiteConnectAPI:
             print(f"KITE_API_LOG: Action: {action}, Status: {status}, Symbol: {symbol}, Remarks: {remarks}, Data: {str(data)[:200] if data else 'N/A'}")
 
     def _save_access_token_data(self, token_data):
+        # Write to a temp file and rename over the real one, so a crash mid-write
+        # never leaves a truncated token file behind.
+        tmp_file = self.access_token_file + '.tmp'
         try:
-            with open(self.access_token_file, 'w') as f:
-                json.dump(token_data, f)
+            with open(tmp_file, 'w') as f:
+                json.dump({**token_data, 'saved_at': time.time()}, f)
+            os.replace(tmp_file, self.access_token_file)
             self._log_api_action("SAVE_TOKEN", "SUCCESS", f"Token saved to {self.access_token_file}")
         except Exception as e:
             self._log_api_action("SAVE_TOKEN", "FAILURE", f"Error saving token: {e}")
@@ -57,6 +65,10 @@ class KiteConnectAPI:
             with open(self.access_token_file, 'r') as f:
                 token_data = json.load(f)
             if 'access_token' in token_data and 'user_id' in token_data:
+                saved_at = token_data.get('saved_at') # Absent in files written by older versions
+                if saved_at is not None and time.time() - saved_at > TOKEN_MAX_AGE_SECONDS:
+                    self._log_api_action("LOAD_TOKEN", "INFO", "Stored token is older than a trading day. New login needed.")
+                    return None
                 self._log_api_action("LOAD_TOKEN", "SUCCESS", f"Token loaded from {self.access_token_file}")
                 return token_data
             else:
@@ -1,23 +1,25 @@
 # algo_trading_system/core/backtest_engine.py
+import logging
+import numpy as np
 import pandas as pd
 from datetime import datetime
 import os # Added for dummy data creation and path joining in main example
+from strategies.signals import Signal, ACTION_TO_SIGNAL
 
-# Attempt relative imports, adjust if necessary based on execution context
 try:
-    from ..data_management.trade_logger import TradeLogger
-    from ..strategies.base_strategy import BaseStrategy
+    import pyarrow.dataset as pa_ds # Optional: column-projected CSV/Parquet reads
 except ImportError:
-    # Fallback for direct execution or if modules are not found with relative paths
-    # This might happen if 'core' is not recognized as part of a package immediately
-    # or if this script is run standalone for testing.
-    # Ensure your PYTHONPATH is set up correctly if running from project root for imports to work.
-    print("Could not perform relative imports for TradeLogger/BaseStrategy in backtest_engine.py. Using placeholder mocks if in __main__.")
-    # Define placeholder mocks if needed for direct script execution, actual instances will be passed from main.py
-    if __name__ == '__main__':
-        TradeLogger = None
-        BaseStrategy = None
+    pa_ds = None
 
+# Per-bar/per-trade messages; lazy %-formatting keeps them free when the level is disabled
+log = logging.getLogger(__name__)
+
+# Source columns the engine uses (before the rename in _load_data); anything else is not read
+DATA_COLUMNS = frozenset({
+    'timestamp', 'Date', 'date', 'time',
+    'open', 'high', 'low', 'close', 'volume',
+    'Open', 'High', 'Low', 'Close', 'Volume',
+})
 
 class BacktestEngine:
     def __init__(self, historical_data_source, strategy, initial_capital, 
@@ -31,7 +33,7 @@ class BacktestEngine:
         Initializes the BacktestEngine.
 
         Args:
-            historical_data_source (str or pd.DataFrame): Path to CSV data file or DataFrame.
+            historical_data_source (str or pd.DataFrame): Path to CSV/.npy/.parquet data file or DataFrame.
             strategy (BaseStrategy): The trading strategy instance.
             initial_capital (float): The starting capital for the backtest.
             start_date (str or datetime): The start date for the backtest.
@@ -65,6 +67,7 @@ class BacktestEngine:
         self.data = self._load_data()
         
         self.trades = [] 
+        self._pending_trade_logs = [] # Trade log rows buffered during run(), written in one batch
         # self.positions structure will be: 
         # {'SYMBOL': {'qty': X, 'avg_price': Y, ..., 'num_entries': N}}
         self.positions = {} 
@@ -90,11 +93,29 @@ class BacktestEngine:
             )
         print(f"BacktestEngine initialized for {self.symbol} from {self.start_date.date()} to {self.end_date.date()} with capital {self.initial_capital}.")
 
+    @staticmethod
+    def _read_columns(path):
+        """Reads only the OHLCV/timestamp columns of a CSV or Parquet file."""
+        fmt = 'parquet' if path.endswith('.parquet') else 'csv'
+        if pa_ds is not None:
+            if not os.path.exists(path): # pyarrow raises its own error type
+                raise FileNotFoundError(path)
+            dataset = pa_ds.dataset(path, format=fmt)
+            columns = [c for c in dataset.schema.names if c in DATA_COLUMNS]
+            return dataset.to_table(columns=columns).to_pandas()
+        if fmt == 'parquet':
+            return pd.read_parquet(path) # Requires pyarrow or fastparquet
+        return pd.read_csv(path, usecols=lambda c: c in DATA_COLUMNS)
+
     def _load_data(self):
         print(f"Loading data for {self.symbol}...")
         if isinstance(self.historical_data_source, str):
             try:
-                df = pd.read_csv(self.historical_data_source)
+                if self.historical_data_source.endswith('.npy'):
+                    # Binary OHLCV record array (see main.py dummy data); memory-mapped, no text parsing
+                    df = pd.DataFrame(np.load(self.historical_data_source, mmap_mode='r'))
+                else:
+                    df = self._read_columns(self.historical_data_source)
             except FileNotFoundError:
                 print(f"ERROR: Data file not found: {self.historical_data_source}")
                 if self.trade_logger:
@@ -145,55 +166,68 @@ class BacktestEngine:
         print(f"Data loaded successfully: {len(df)} rows from {df.index.min().date()} to {df.index.max().date()}")
         return df
 
+    def _log_trade(self, **trade):
+        # Buffer instead of writing one row per trade; see _flush_trade_logs.
+        # The time is taken now so each row keeps its own timestamp when written later.
+        if self.trade_logger:
+            self._pending_trade_logs.append({**trade, 'timestamp': datetime.now()})
+
+    def _flush_trade_logs(self):
+        if not self._pending_trade_logs:
+            return
+        if hasattr(self.trade_logger, 'log_trade_batch'):
+            self.trade_logger.log_trade_batch(self._pending_trade_logs)
+        else: # Loggers without batch support get the rows one by one
+            for trade in self._pending_trade_logs:
+                self.trade_logger.log_trade(**{k: v for k, v in trade.items() if k != 'timestamp'})
+        self._pending_trade_logs = []
+
     def _calculate_brokerage(self, trade_value):
         return trade_value * (self.brokerage_percent / 100.0)
 
-    def _apply_slippage(self, price, action):
-        slippage_amount = price * (self.slippage_percent / 100.0)
-        if action == 'BUY':
-            return price + slippage_amount
-        elif action == 'SELL':
-            return price - slippage_amount
-        return price
+    def _apply_slippage(self, price, direction):
+        # Fills move against the trade: up for BUY (+1), down for SELL (-1), none for HOLD (0)
+        return price * (1 + direction * self.slippage_percent / 100.0)
 
-    def _execute_signal(self, signal_details, current_bar_data):
-    def _execute_signal(self, signal_details, current_bar_data): # quantity_to_trade removed from args, use self.qty_per_trade
+    def _execute_signal(self, signal_details, current_bar_data, direction=None): # quantity_to_trade removed from args, use self.qty_per_trade
         action = signal_details.get('action')
-        signal_price = signal_details.get('price', current_bar_data['close']) 
+        if direction is None:
+            direction = ACTION_TO_SIGNAL.get(action, Signal.HOLD)
+        signal_price = signal_details.get('price', current_bar_data.close) 
         quantity_to_trade = self.qty_per_trade # Use instance variable
 
         pos_details = self.positions.get(self.symbol)
 
-        if action == 'BUY':
+        if direction == Signal.BUY:
             if pos_details and pos_details.get('entry_type') == 'LONG': # Already long
                 if not self.allow_pyramiding or pos_details.get('num_entries', 0) >= self.max_pyramid_entries:
-                    # print(f"{current_bar_data.name} - INFO: Pyramiding not allowed or max entries reached for {self.symbol}. Holding.")
+                    # print(f"{current_bar_data.Index} - INFO: Pyramiding not allowed or max entries reached for {self.symbol}. Holding.")
                     return # No new BUY
                 # Pyramiding allowed and entries < max: proceed to buy more
-                print(f"{current_bar_data.name} - INFO: Pyramiding BUY for {self.symbol}. Current entries: {pos_details.get('num_entries',0)}")
+                log.info("%s - INFO: Pyramiding BUY for %s. Current entries: %s", current_bar_data.Index, self.symbol, pos_details.get('num_entries', 0))
             # If no existing long position, or if pyramiding is allowed and conditions met, proceed to BUY logic.
         
-        elif action == 'SELL': # This is for closing a long or entering a short
+        elif direction == Signal.SELL: # This is for closing a long or entering a short
             if pos_details and pos_details.get('entry_type') == 'LONG': # Existing long position, this SELL is to close it
                 # This part of logic is for closing the existing long position
                 entry_price = pos_details['avg_price']
                 closed_qty = pos_details['qty'] # Close the entire position for now
-                exec_price_sell = self._apply_slippage(signal_price, 'SELL') # Slippage on sell
+                exec_price_sell = self._apply_slippage(signal_price, Signal.SELL) # Slippage on sell
                 brokerage_sell = self._calculate_brokerage(exec_price_sell * closed_qty)
                 pnl = (exec_price_sell - entry_price) * closed_qty - brokerage_sell
                 self.current_capital += (closed_qty * exec_price_sell) - brokerage_sell
                 # ... (logging and trade recording for closing trade - this part is mostly fine) ...
-                log_msg = f"EXECUTED: SELL_CLOSE {closed_qty} {self.symbol} at {exec_price_sell:.2f} (from entry {entry_price:.2f}). PnL: {pnl:.2f}"
-                print(f"{current_bar_data.name} - {log_msg}")
+                log.info("%s - EXECUTED: SELL_CLOSE %s %s at %.2f (from entry %.2f). PnL: %.2f",
+                         current_bar_data.Index, closed_qty, self.symbol, exec_price_sell, entry_price, pnl)
                 if pnl > 0: self.winning_trades +=1
                 else: self.losing_trades +=1
                 self.total_trades +=1
                 self.trades.append({
-                    'symbol': self.symbol, 'entry_time': pos_details['entry_time'], 'exit_time': current_bar_data.name,
+                    'symbol': self.symbol, 'entry_time': pos_details['entry_time'], 'exit_time': current_bar_data.Index,
                     'entry_price': entry_price, 'exit_price': exec_price_sell, 'qty': closed_qty,
                     'pnl': pnl, 'type': pos_details['entry_type'], 'exit_reason': signal_details.get('reason', 'STRATEGY_SELL_CLOSE')
                 })
-                if self.trade_logger: self.trade_logger.log_trade(self.strategy.name, self.symbol, "BACKTEST", "SELL", closed_qty, exec_price_sell, "MARKET", status="EXECUTED_CLOSE", remarks=f"Capital: {self.current_capital:.2f}, Trade PnL: {pnl:.2f}, Reason: {signal_details.get('reason', 'STRATEGY_SELL_CLOSE')}")
+                self._log_trade(strategy_name=self.strategy.name, symbol=self.symbol, exchange="BACKTEST", action="SELL", quantity=closed_qty, price=exec_price_sell, order_type="MARKET", status="EXECUTED_CLOSE", remarks=f"Capital: {self.current_capital:.2f}, Trade PnL: {pnl:.2f}, Reason: {signal_details.get('reason', 'STRATEGY_SELL_CLOSE')}")
                 del self.positions[self.symbol]
                 return # Explicitly return after closing a position based on SELL signal
             
@@ -201,19 +235,19 @@ class BacktestEngine:
             # Add short selling logic here if desired, respecting pyramiding for shorts.
             # For now, we are not implementing short selling entry.
             # if not pos_details: # Or if pos_details.get('entry_type') == 'SHORT' and allow_pyramiding_short...
-            # print(f"{current_bar_data.name} - INFO: SELL signal received, no current LONG position to close. Short selling not implemented in this engine version.")
+            # print(f"{current_bar_data.Index} - INFO: SELL signal received, no current LONG position to close. Short selling not implemented in this engine version.")
             return # No action if SELL signal and no long position to close.
 
         # Common execution logic for BUY (new entry or pyramiding)
-        if action == 'BUY': # This block will only be reached for initial BUY or allowed pyramid BUY
-            exec_price_buy = self._apply_slippage(signal_price, 'BUY')
+        if direction == Signal.BUY: # This block will only be reached for initial BUY or allowed pyramid BUY
+            exec_price_buy = self._apply_slippage(signal_price, Signal.BUY)
             trade_value_buy = exec_price_buy * quantity_to_trade
             brokerage_buy = self._calculate_brokerage(trade_value_buy)
 
             if self.current_capital < trade_value_buy + brokerage_buy:
                 # ... (insufficient funds logging) ...
-                print(f"{current_bar_data.name} - INSUFFICIENT_FUNDS: Cannot {action} {quantity_to_trade} {self.symbol} at {exec_price_buy:.2f}.")
-                if self.trade_logger: self.trade_logger.log_trade(self.strategy.name, self.symbol, "BACKTEST", action, quantity_to_trade, exec_price_buy, "MARKET", status="REJECTED", remarks="Insufficient funds")
+                log.warning("%s - INSUFFICIENT_FUNDS: Cannot %s %s %s at %.2f.", current_bar_data.Index, action, quantity_to_trade, self.symbol, exec_price_buy)
+                self._log_trade(strategy_name=self.strategy.name, symbol=self.symbol, exchange="BACKTEST", action=action, quantity=quantity_to_trade, price=exec_price_buy, order_type="MARKET", status="REJECTED", remarks="Insufficient funds")
                 return
 
             self.current_capital -= (trade_value_buy + brokerage_buy)
@@ -224,13 +258,13 @@ class BacktestEngine:
                 self.positions[self.symbol] = {
                     'qty': quantity_to_trade, 
                     'avg_price': exec_price_buy, 
-                    'entry_time': current_bar_data.name, 
+                    'entry_time': current_bar_data.Index, 
                     'stop_loss': entry_sl, 
                     'target': entry_tp, 
                     'entry_type': 'LONG',
                     'num_entries': 1
                 }
-                log_msg_details = f"New Entry. SL: {entry_sl:.2f if entry_sl else 'N/A'}, TP: {entry_tp:.2f if entry_tp else 'N/A'}"
+                log_msg_details = f"New Entry. SL: {f'{entry_sl:.2f}' if entry_sl else 'N/A'}, TP: {f'{entry_tp:.2f}' if entry_tp else 'N/A'}"
             else: # Pyramiding into existing LONG position
                 new_total_qty = pos_details['qty'] + quantity_to_trade
                 new_avg_price = ((pos_details['avg_price'] * pos_details['qty']) + (exec_price_buy * quantity_to_trade)) / new_total_qty
@@ -241,18 +275,17 @@ class BacktestEngine:
                 # For simplicity, let's assume the latest signal's SL/TP applies to the whole position, or they are None.
                 if entry_sl: pos_details['stop_loss'] = entry_sl 
                 if entry_tp: pos_details['target'] = entry_tp
-                log_msg_details = f"Pyramid Entry #{pos_details['num_entries']}. New AvgPx: {new_avg_price:.2f}. SL: {entry_sl:.2f if entry_sl else 'N/A'}, TP: {entry_tp:.2f if entry_tp else 'N/A'}"
-
-            log_action_msg = f"EXECUTED: BUY {quantity_to_trade} {self.symbol} at {exec_price_buy:.2f}. {log_msg_details}"
-            print(f"{current_bar_data.name} - {log_action_msg}")
-            if self.trade_logger: 
-                self.trade_logger.log_trade(
-                    self.strategy.name, self.symbol, "BACKTEST", action, quantity_to_trade, exec_price_buy, "MARKET", 
-                    status="EXECUTED_BUY", 
-                    stop_loss=self.positions[self.symbol]['stop_loss'], 
-                    target=self.positions[self.symbol]['target'], 
-                    remarks=f"Capital: {self.current_capital:.2f}. {log_msg_details}"
-                )
+                log_msg_details = f"Pyramid Entry #{pos_details['num_entries']}. New AvgPx: {new_avg_price:.2f}. SL: {f'{entry_sl:.2f}' if entry_sl else 'N/A'}, TP: {f'{entry_tp:.2f}' if entry_tp else 'N/A'}"
+
+            log.info("%s - EXECUTED: BUY %s %s at %.2f. %s", current_bar_data.Index, quantity_to_trade, self.symbol, exec_price_buy, log_msg_details)
+            self._log_trade(
+                strategy_name=self.strategy.name, symbol=self.symbol, exchange="BACKTEST", action=action,
+                quantity=quantity_to_trade, price=exec_price_buy, order_type="MARKET", 
+                status="EXECUTED_BUY", 
+                stop_loss=self.positions[self.symbol]['stop_loss'], 
+                target=self.positions[self.symbol]['target'], 
+                remarks=f"Capital: {self.current_capital:.2f}. {log_msg_details}"
+            )
         # (No explicit SELL entry logic for short positions here, this was handled above)
 
     def _check_sl_tp(self, current_bar_data):
@@ -270,34 +303,34 @@ class BacktestEngine:
         exit_price = None
 
         if entry_type == 'LONG':
-            if sl_price and current_bar_data['low'] <= sl_price:
-                exit_price = self._apply_slippage(sl_price, 'SELL')
+            if sl_price and current_bar_data.low <= sl_price:
+                exit_price = self._apply_slippage(sl_price, Signal.SELL)
                 exit_reason = "STOP_LOSS_HIT"
-            elif tp_price and current_bar_data['high'] >= tp_price:
-                exit_price = self._apply_slippage(tp_price, 'SELL')
+            elif tp_price and current_bar_data.high >= tp_price:
+                exit_price = self._apply_slippage(tp_price, Signal.SELL)
                 exit_reason = "TARGET_HIT"
-        # Add logic for SHORT positions if implemented (e.g. if current_bar_data['high'] >= sl_price for short)
+        # Add logic for SHORT positions if implemented (e.g. if current_bar_data.high >= sl_price for short)
 
         if exit_reason:
             brokerage = self._calculate_brokerage(exit_price * qty)
             pnl = (exit_price - entry_price) * qty - brokerage # For LONG
 
             self.current_capital += (qty * exit_price) - brokerage
-            log_msg = f"{exit_reason}: SELL {qty} {self.symbol} at {exit_price:.2f} (from entry {entry_price:.2f}). PnL: {pnl:.2f}"
-            print(f"{current_bar_data.name} - {log_msg}")
+            log.info("%s - %s: SELL %s %s at %.2f (from entry %.2f). PnL: %.2f",
+                     current_bar_data.Index, exit_reason, qty, self.symbol, exit_price, entry_price, pnl)
 
             if pnl > 0: self.winning_trades +=1
             else: self.losing_trades +=1
             self.total_trades +=1
             
             self.trades.append({
-                'symbol': self.symbol, 'entry_time': pos_details['entry_time'], 'exit_time': current_bar_data.name,
+                'symbol': self.symbol, 'entry_time': pos_details['entry_time'], 'exit_time': current_bar_data.Index,
                 'entry_price': entry_price, 'exit_price': exit_price, 'qty': qty,
                 'pnl': pnl, 'type': entry_type, 'exit_reason': exit_reason
             })
             del self.positions[self.symbol]
 
-            if self.trade_logger: self.trade_logger.log_trade(self.strategy.name, self.symbol, "BACKTEST", "SELL", qty, exit_price, "MARKET", status=exit_reason, remarks=f"Capital: {self.current_capital:.2f}, Trade PnL: {pnl:.2f}")
+            self._log_trade(strategy_name=self.strategy.name, symbol=self.symbol, exchange="BACKTEST", action="SELL", quantity=qty, price=exit_price, order_type="MARKET", status=exit_reason, remarks=f"Capital: {self.current_capital:.2f}, Trade PnL: {pnl:.2f}")
 
 
     def run(self):
@@ -306,24 +339,55 @@ class BacktestEngine:
             return None
 
         print(f"--- Running Backtest for Strategy: {self.strategy.name} on {self.symbol} ---")
+
+        # Strategies that can compute all signals at once return an int8 array
+        # (+1 BUY, -1 SELL, 0 none); otherwise fall back to per-bar generate_signals.
+        batch_signals = None
+        if hasattr(self.strategy, 'generate_signals_batch'):
+            batch_signals = self.strategy.generate_signals_batch(self.data)
         
-        for timestamp, current_bar in self.data.iterrows():
+        try:
+            self._run_bars(batch_signals)
+        finally:
+            self._flush_trade_logs() # Also keeps rows logged before an error
+
+        self._generate_summary()
+        print(f"--- Backtest Finished for Strategy: {self.strategy.name} on {self.symbol} ---")
+        return self.trades
+
+    def _run_bars(self, batch_signals):
+        # Extracted once; per-bar pandas lookups dominate the loop otherwise
+        closes = self.data['close'].to_numpy()
+
+        # itertuples yields light namedtuples (Index, open, high, ...) rather than
+        # building a Series per bar as iterrows does
+        for i, current_bar in enumerate(self.data.itertuples(index=True, name='Bar')):
             self._check_sl_tp(current_bar) # Check SL/TP first
 
-            if not self.positions.get(self.symbol): # Only consider new entry signals if no position
-                data_for_signal = self.data[self.data.index <= timestamp] # Data up to current bar
+            signal_output, direction = None, Signal.HOLD
+            if batch_signals is not None:
+                if batch_signals[i] and not self.positions.get(self.symbol):
+                    direction = batch_signals[i]
+                    signal_output = self.strategy.build_signal(direction, closes[i])
+            else:
+                # Data up to current bar. The index is sorted in _load_data, so a
+                # positional slice replaces the O(N) timestamp mask per bar.
+                data_for_signal = self.data.iloc[:i + 1]
                 
                 # Strategy's generate_signals method should return a dict like:
                 # {'action': 'BUY'/'SELL', 'price': (optional price), 'sl': (optional sl), 'tp': (optional tp)}
-                # or None/{} if no signal.
+                # or a Signal/int direction, or None/{} if no signal.
+                # It is called on every bar so stateful strategies see the full series,
+                # but signals only act when there is no open position.
                 signal_output = self.strategy.generate_signals(historical_data=data_for_signal)
+                if isinstance(signal_output, dict):
+                    direction = ACTION_TO_SIGNAL.get(signal_output.get('action'), Signal.HOLD)
+                elif signal_output: # Bare direction, expand it like a batch signal
+                    direction = signal_output
+                    signal_output = self.strategy.build_signal(direction, closes[i])
 
-                if signal_output and isinstance(signal_output, dict) and signal_output.get('action') in ['BUY', 'SELL']:
-                    self._execute_signal(signal_output, current_bar)
-                
-        self._generate_summary()
-        print(f"--- Backtest Finished for Strategy: {self.strategy.name} on {self.symbol} ---")
-        return self.trades
+            if direction and not self.positions.get(self.symbol): # Only consider new entry signals if no position
+                self._execute_signal(signal_output, current_bar, direction)
 
     def _generate_summary(self):
         final_capital = self.current_capital
@@ -380,7 +444,7 @@ if __name__ == '__main__':
     print("BacktestEngine class defined. This __main__ block is for basic testing.")
     
     # --- Mock Objects for standalone testing ---
-    # Redefine mocks here as they might not be available if relative imports failed
+    # The engine only needs duck-typed logger/strategy objects
     class MockTradeLoggerForTest:
         def __init__(self, log_dir="logs_backtest_test"):
             self.log_dir = log_dir
@@ -446,7 +510,6 @@ if __name__ == '__main__':
     if os.path.exists(dummy_csv_file):
         print("\n--- Running Mock Backtest from __main__ ---")
         mock_logger_instance = MockTradeLoggerForTest()
-        # If BaseStrategy was not imported, MockStrategyForTest will be used.
         mock_strategy_instance = MockStrategyForTest(name="TestMockStrategy")
         
         engine = BacktestEngine(
@@ -476,5 +539,3 @@ if __name__ == '__main__':
 
     else:
         print(f"Dummy CSV file {dummy_csv_file} not found. Cannot run mock test from __main__.")
-
-```
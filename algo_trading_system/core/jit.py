@@ -0,0 +1,16 @@
+# algo_trading_system/core/jit.py
+# Optional Numba support. Strategies decorate numeric kernels with njit/prange from here;
+# without numba installed the decorators are no-ops and the kernels run as plain Python
+# (same results, much slower). numba is an optional install: requirements-numba.txt.
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit; supports both @njit and @njit(...) forms."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
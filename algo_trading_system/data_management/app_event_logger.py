@@ -0,0 +1,35 @@
+# algo_trading_system/data_management/app_event_logger.py
+import csv
+import os
+from datetime import datetime
+
+class AppEventLogger:
+    """
+    Logs application-level events (start/end, login, configuration errors) to a narrow
+    CSV, keeping them out of the trade log whose rows describe orders and fills.
+    """
+    def __init__(self, event_log_file='application.log'):
+        self.event_log_file = event_log_file
+        self._initialize_event_log()
+
+    def _initialize_event_log(self):
+        # Create logs directory if it doesn't exist (a bare filename lives in the cwd)
+        log_dir = os.path.dirname(self.event_log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        if not os.path.exists(self.event_log_file):
+            with open(self.event_log_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['Timestamp', 'Action', 'Status', 'Remarks'])
+
+    def log_event(self, action, status, remarks=''):
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        try:
+            with open(self.event_log_file, 'a', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([timestamp, action, status, remarks])
+            print(f"Event logged: {action} {status}")
+            return True
+        except Exception as e:
+            print(f"Error logging event: {e}")
+            return False
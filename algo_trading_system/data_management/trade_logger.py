@@ -1,20 +1,27 @@
 # algo_trading_system/data_management/trade_logger.py
 import csv
+import io
 import os
+import threading
 from datetime import datetime
 
 class TradeLogger:
-    def __init__(self, trade_log_file='trades.csv', daily_summary_file='daily_summary.csv'):
+    def __init__(self, trade_log_file='trades.csv', daily_summary_file='daily_summary.csv', opener=open):
         self.trade_log_file = trade_log_file
         self.daily_summary_file = daily_summary_file
+        self._open = opener # open()-compatible factory; tests pass one backed by in-memory buffers
+        self._trade_log_fp = None # Opened on first write and kept open (see _trade_log_writer)
+        self._trade_log_lock = threading.Lock() # Orders can be logged from several threads at once
         self._initialize_trade_log()
         self._initialize_daily_summary()
 
     def _initialize_trade_log(self):
-        # Create logs directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.trade_log_file), exist_ok=True)
+        # Create logs directory if it doesn't exist (a bare filename lives in the cwd)
+        log_dir = os.path.dirname(self.trade_log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
         if not os.path.exists(self.trade_log_file):
-            with open(self.trade_log_file, 'w', newline='') as f:
+            with self._open(self.trade_log_file, 'w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow([
                     'Timestamp', 'Strategy', 'Symbol', 'Exchange', 
@@ -24,10 +31,12 @@ class TradeLogger:
         print(f"Trade log initialized: {self.trade_log_file}")
 
     def _initialize_daily_summary(self):
-        # Create logs directory if it doesn't exist
-        os.makedirs(os.path.dirname(self.daily_summary_file), exist_ok=True)
+        # Create logs directory if it doesn't exist (a bare filename lives in the cwd)
+        log_dir = os.path.dirname(self.daily_summary_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
         if not os.path.exists(self.daily_summary_file):
-            with open(self.daily_summary_file, 'w', newline='') as f:
+            with self._open(self.daily_summary_file, 'w', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow([
                     'Date', 'RealizedPnL', 'UnrealizedPnL', 'TotalPnL', 
@@ -35,23 +44,72 @@ class TradeLogger:
                 ])
         print(f"Daily summary log initialized: {self.daily_summary_file}")
 
+    def _trade_log_writer(self):
+        # One append handle for the logger's lifetime instead of an open() per row;
+        # callers hold _trade_log_lock and flush after writing so the CSV on disk stays current.
+        if self._trade_log_fp is None or self._trade_log_fp.closed:
+            self._trade_log_fp = self._open(self.trade_log_file, 'a', newline='')
+            self._trade_log_csv = csv.writer(self._trade_log_fp)
+        return self._trade_log_csv
+
+    def close(self):
+        with self._trade_log_lock:
+            if self._trade_log_fp is not None and not self._trade_log_fp.closed:
+                self._trade_log_fp.close()
+
+    @staticmethod
+    def _format_timestamp(ts):
+        return ts.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+    @staticmethod
+    def _trade_row(timestamp, strategy_name, symbol, exchange, action, quantity, price,
+                   order_type, stop_loss=None, target=None, order_id=None, status='PENDING', remarks=''):
+        return [
+            timestamp, strategy_name, symbol, exchange, action, quantity, price,
+            order_type, stop_loss, target, order_id, status, remarks
+        ]
+
     def log_trade(self, strategy_name, symbol, exchange, action, quantity, price, 
                   order_type, stop_loss=None, target=None, order_id=None, status='PENDING', remarks=''):
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        trade_data = [
+        timestamp = self._format_timestamp(datetime.now())
+        trade_data = self._trade_row(
             timestamp, strategy_name, symbol, exchange, action, quantity, price,
             order_type, stop_loss, target, order_id, status, remarks
-        ]
+        )
         try:
-            with open(self.trade_log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(trade_data)
+            with self._trade_log_lock:
+                self._trade_log_writer().writerow(trade_data)
+                self._trade_log_fp.flush()
             print(f"Trade logged: {action} {quantity} {symbol} by {strategy_name}")
             return True
         except Exception as e:
             print(f"Error logging trade: {e}")
             return False
 
+    def log_trade_batch(self, trades):
+        # Logs many trades with one file open, one write and one fsync, instead of
+        # an open/write per trade. Each item is a dict of log_trade keyword arguments.
+        # Used by the BacktestEngine, which buffers its trades during a run; an optional
+        # 'timestamp' (datetime) per trade records when it happened rather than when it was written.
+        if not trades:
+            return True
+        now = datetime.now()
+        try:
+            rows = [self._trade_row(**{**trade, 'timestamp': self._format_timestamp(trade.get('timestamp', now))})
+                    for trade in trades]
+            with self._trade_log_lock:
+                self._trade_log_writer().writerows(rows)
+                self._trade_log_fp.flush()
+                try:
+                    os.fsync(self._trade_log_fp.fileno())
+                except io.UnsupportedOperation:
+                    pass # In-memory stream from a custom opener; nothing to sync
+            print(f"Trades logged: {len(rows)} rows")
+            return True
+        except Exception as e:
+            print(f"Error logging trade batch: {e}")
+            return False
+
     def update_trade_status(self, order_id, new_status, remarks=''):
         # This method logs a new entry to indicate a status update for an existing order.
         # It does not modify the original trade log entry in the CSV file.
@@ -59,15 +117,15 @@ class TradeLogger:
         # an auditable trail of status changes. For analysis, one would typically process
         # the entire log file, taking the latest status for a given order_id.
         print(f"Logging status update for OrderID {order_id} to {new_status}.") # Changed print message for clarity
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        timestamp = self._format_timestamp(datetime.now())
         update_data = [
             timestamp, 'SYSTEM_UPDATE', '-', '-', 'UPDATE_STATUS', 0, 0.0,
             '-', None, None, order_id, new_status, f"Status update. Prior remarks: {remarks}" # Slightly rephrased remarks
         ]
         try:
-            with open(self.trade_log_file, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(update_data)
+            with self._trade_log_lock:
+                self._trade_log_writer().writerow(update_data)
+                self._trade_log_fp.flush()
             print(f"Trade status update logged for OrderID {order_id}.")
             return True
         except Exception as e:
@@ -85,7 +143,7 @@ class TradeLogger:
         try:
             # Check if an entry for today already exists, if so, update it (optional, simple append for now)
             # More robust would be to read, find if date exists, update row or append.
-            with open(self.daily_summary_file, 'a', newline='') as f:
+            with self._open(self.daily_summary_file, 'a', newline='') as f:
                 writer = csv.writer(f)
                 writer.writerow(summary_data)
             print(f"Daily summary logged for {date_today}.")
@@ -150,6 +208,7 @@ if __name__ == '__main__':
         losing_trades=2
     )
     
+    logger.close()
     print(f"Sample logs created: {logger.trade_log_file}, {logger.daily_summary_file}")
     
     # To clean up, you might want to remove the 'logs' directory and its contents
@@ -2,11 +2,22 @@
 
 import sys
 import os # For path joining
+import argparse # For mode/backtest command-line options
+import enum
+import importlib # Broker SDK modules are imported only when live mode needs them
+import logging # Per-trade/per-bar messages from the engine and strategies
+import logging.handlers
+import queue
+import random # Jitter for broker call retries
 import time # Added for position tracking loop
-# Keep existing imports: KiteConnectAPI, TradeLogger
-from brokers.zerodha.kite_connect import KiteConnectAPI 
-from brokers.upstox.upstox_api import UpstoxAPI # Added UpstoxAPI
+from concurrent.futures import ThreadPoolExecutor # For concurrent account info calls in live mode
+from http.server import BaseHTTPRequestHandler, HTTPServer # Local login redirect listener
+from urllib.parse import urlparse, parse_qs
+from collections import namedtuple
+from pathlib import Path
+import numpy as np # For the synthetic backtest data file
 from data_management.trade_logger import TradeLogger
+from data_management.app_event_logger import AppEventLogger
 from strategies.sma_crossover_strategy import SmaCrossoverStrategy # Import the new strategy
 
 # Import configurations from config.py
@@ -28,18 +39,38 @@ except ImportError:
     print("You might need to copy config.py.example to config.py and fill it out.")
     sys.exit(1)
 
-# Existing run_manual_tests(broker_api) function can remain unchanged for now
-# ... (paste existing run_manual_tests function here if you need to show full context, otherwise assume it's there)
+# Optional: port of a loopback redirect URL (e.g. http://127.0.0.1:5000/) registered with the broker app.
+# When set, the login token is captured from the browser redirect instead of being pasted in.
+try:
+    from config import LOGIN_CALLBACK_PORT
+except ImportError:
+    LOGIN_CALLBACK_PORT = None
+
+# Record layout of the synthetic backtest data written when no historical data is available
+DUMMY_DATA_DTYPE = np.dtype([
+    ('date', 'datetime64[s]'), ('open', 'f8'), ('high', 'f8'),
+    ('low', 'f8'), ('close', 'f8'), ('volume', 'i8'),
+])
+
 def run_manual_tests(broker_api):
     print("\n--- Running Manual Account Info Tests ---")
 
-    profile = broker_api.get_profile()
+    # The four calls are independent REST round-trips; issue them concurrently
+    # (the broker clients are blocking, so each runs in a worker thread).
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        f_profile, f_margins, f_positions, f_holdings = [
+            ex.submit(fn) for fn in (broker_api.get_profile, broker_api.get_margins,
+                                     broker_api.get_positions, broker_api.get_holdings)
+        ]
+        profile, margins, positions, holdings = (
+            f_profile.result(), f_margins.result(), f_positions.result(), f_holdings.result()
+        )
+
     if profile:
         print(f"\nUser Profile: {profile.get('user_name')}, Email: {profile.get('email')}, User ID: {profile.get('user_id')}")
     else:
         print("\nFailed to fetch profile.")
 
-    margins = broker_api.get_margins()
     if margins:
         if 'equity' in margins and margins['equity']:
             print(f"\nMargins (Equity Net): {margins['equity'].get('net')}")
@@ -49,7 +80,6 @@ def run_manual_tests(broker_api):
     else:
         print("\nFailed to fetch margins.")
 
-    positions = broker_api.get_positions()
     if positions:
         print(f"\nDay Positions Count: {len(positions.get('day', []))}")
         for pos in positions.get('day', []):
@@ -60,7 +90,6 @@ def run_manual_tests(broker_api):
     else:
         print("\nFailed to fetch positions.")
 
-    holdings = broker_api.get_holdings()
     if holdings:
         print(f"\nHoldings Count: {len(holdings)}")
         for holding in holdings:
@@ -70,81 +99,178 @@ def run_manual_tests(broker_api):
     print("\n--- Manual Account Info Tests Finished ---")
 
 
-def run_live_trading_flow(logger):
-    print("--- Starting Algo Trading System (Live Trading Mode) ---")
-    logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_START_LIVE", quantity=0, price=0, order_type="-", status="SUCCESS", remarks="Application started in live trading mode.")
+def _fetch_with_retry(fetch, tries=3, base_delay=0.2):
+    """
+    Calls a broker API getter, retrying with jittered exponential backoff.
+    The broker wrappers log and swallow errors, returning None on failure, so a
+    None result (or an unexpected exception) is treated as transient. Returns
+    None once all attempts have failed.
+    """
+    for attempt in range(tries):
+        try:
+            result = fetch()
+            if result is not None:
+                return result
+        except Exception as e:
+            print(f"Attempt {attempt + 1}/{tries} failed: {e}")
+        if attempt < tries - 1:
+            time.sleep(base_delay * (2 ** attempt) + random.random() * base_delay)
+    return None
+
+
+# Values config.py ships with (or left blank) that mean "not configured"
+_PLACEHOLDER_CREDENTIALS = frozenset({
+    "", "YOUR_API_KEY_HERE", "YOUR_API_SECRET_HERE",
+    "YOUR_UPSTOX_API_KEY_HERE", "YOUR_UPSTOX_API_SECRET_HERE",
+})
+
+# Per-broker login metadata; the login flow itself is shared (see _do_login)
+BrokerSpec = namedtuple('BrokerSpec', 'label api_class init_kwargs credentials_ok override_kwarg token_label redirect_param prompt_text instructions')
+
+BROKER_SPECS = {
+    "zerodha": BrokerSpec(
+        label="Zerodha",
+        api_class="brokers.zerodha.kite_connect:KiteConnectAPI",
+        init_kwargs={"api_key": ZERODHA_API_KEY},
+        credentials_ok=ZERODHA_API_KEY not in _PLACEHOLDER_CREDENTIALS and ZERODHA_API_SECRET not in _PLACEHOLDER_CREDENTIALS,
+        override_kwarg="request_token_override",
+        token_label="request_token",
+        redirect_param="request_token",
+        prompt_text="Enter the 'request_token' here",
+        instructions=(
+            "2. Login with your Zerodha credentials.",
+            "3. After successful login, you will be redirected to a URL containing a 'request_token'.",
+            "   Example: https://yourredirecturl.com/?status=success&request_token=THIS_IS_YOUR_TOKEN",
+        ),
+    ),
+    "upstox": BrokerSpec(
+        label="Upstox",
+        api_class="brokers.upstox.upstox_api:UpstoxAPI",
+        init_kwargs={"api_key": UPSTOX_API_KEY, "api_secret": UPSTOX_API_SECRET, "redirect_uri": UPSTOX_REDIRECT_URI},
+        credentials_ok=UPSTOX_API_KEY not in _PLACEHOLDER_CREDENTIALS and UPSTOX_API_SECRET not in _PLACEHOLDER_CREDENTIALS,
+        override_kwarg="auth_code_override",
+        token_label="auth_code",
+        redirect_param="code",
+        prompt_text="Enter the 'code' (auth_code) here",
+        instructions=(
+            "2. Login with your Upstox credentials and authorize the app.",
+            "3. After successful authorization, you will be redirected to your redirect_uri with an 'code' (auth_code) in the URL.",
+            "   Example: YOUR_REDIRECT_URI?code=THIS_IS_YOUR_AUTH_CODE",
+        ),
+    ),
+}
+
+
+def _load_api_class(path):
+    """
+    Imports "package.module:ClassName" and returns the class. Broker clients are
+    resolved this way so backtests never import (or need) the broker SDKs.
+    """
+    module_name, class_name = path.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
 
-    broker_api = None # Initialize to None
-    access_token = None
 
-    if ACTIVE_BROKER == "zerodha":
-        if ZERODHA_API_KEY == "YOUR_API_KEY_HERE" or ZERODHA_API_SECRET == "YOUR_API_SECRET_HERE":
-            print("\nERROR: Zerodha API Key or Secret not configured in config.py for active broker 'zerodha'.")
-            logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="FAILURE", remarks="Zerodha API Key/Secret not configured.")
-            sys.exit(1)
-        
-        broker_api = KiteConnectAPI(api_key=ZERODHA_API_KEY, logger=logger)
-        access_token = broker_api.login() # Zerodha's specific login flow
-
-        if not access_token: # Zerodha specific re-prompt
-            print("\n--- LOGIN REQUIRED for Zerodha (Live Mode) ---")
-            login_url = broker_api.get_login_url()
-            print(f"1. Open this URL in your browser: {login_url}")
-            print("2. Login with your Zerodha credentials.")
-            print("3. After successful login, you will be redirected to a URL containing a 'request_token'.")
-            print("   Example: https://yourredirecturl.com/?status=success&request_token=THIS_IS_YOUR_TOKEN")
+def _wait_for_login_redirect(port, param, timeout=300):
+    """
+    Serves 127.0.0.1:port until the broker's login redirect arrives and returns
+    the value of query parameter `param` (None on timeout).
+    Raises OSError if the port cannot be bound.
+    """
+    captured = {}
+
+    class _RedirectHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            values = parse_qs(urlparse(self.path).query).get(param)
+            if values:
+                captured['token'] = values[0]
+            self.send_response(200 if values else 404)
+            self.send_header("Content-Type", "text/plain")
+            self.end_headers()
+            self.wfile.write(b"Login received. You can close this tab." if values else b"Waiting for login redirect.")
+
+        def log_message(self, format, *args):
+            pass # Keep the console clean
+
+    deadline = time.monotonic() + timeout
+    with HTTPServer(("127.0.0.1", port), _RedirectHandler) as httpd:
+        while 'token' not in captured and time.monotonic() < deadline:
+            httpd.timeout = max(deadline - time.monotonic(), 0.1)
+            httpd.handle_request() # One request at a time (browsers may ask for /favicon.ico first)
+    return captured.get('token')
+
+
+def _do_login(spec, logger, app_log):
+    """
+    Creates the broker API client described by spec and logs in, first via the
+    broker's stored token and then with a fresh token captured from the login
+    redirect (if LOGIN_CALLBACK_PORT is configured) or entered by the user.
+    Exits the application if credentials are missing or the user aborts.
+
+    Returns:
+        (broker_api, access_token): access_token is None if login failed.
+    """
+    if not spec.credentials_ok:
+        print(f"\nERROR: {spec.label} API Key or Secret not configured in config.py for active broker '{ACTIVE_BROKER}'.")
+        app_log.log_event("APP_EXIT_LIVE", "FAILURE", f"{spec.label} API Key/Secret not configured.")
+        sys.exit(1)
+
+    broker_api = _load_api_class(spec.api_class)(**spec.init_kwargs, logger=logger)
+    access_token = broker_api.login() # Tries the stored token first
+    if access_token:
+        print(f"Reused cached {spec.label} access token.")
+
+    if not access_token: # Re-prompt for a fresh token
+        print(f"\n--- LOGIN REQUIRED for {spec.label} (Live Mode) ---")
+        login_url = broker_api.get_login_url()
+        print(f"1. Open this URL in your browser: {login_url}")
+        for line in spec.instructions:
+            print(line)
+        user_provided_token = None
+        if LOGIN_CALLBACK_PORT:
+            print(f"\nWaiting for the login redirect on http://127.0.0.1:{LOGIN_CALLBACK_PORT}/ ...")
             try:
-                user_provided_request_token = input("\n4. Enter the 'request_token' here: ").strip()
+                user_provided_token = _wait_for_login_redirect(LOGIN_CALLBACK_PORT, spec.redirect_param)
+            except OSError as e:
+                print(f"Could not listen on port {LOGIN_CALLBACK_PORT} ({e}). Falling back to manual entry.")
             except KeyboardInterrupt:
                 print("\nLogin process aborted by user.")
-                logger.log_trade(strategy_name="SYSTEM", symbol="ZERODHA", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="ABORTED", remarks="Login aborted by user.")
+                app_log.log_event("APP_EXIT_LIVE", "ABORTED", f"Login aborted by user for {spec.label}.")
                 sys.exit(1)
+        try:
+            if not user_provided_token:
+                user_provided_token = input(f"\n4. {spec.prompt_text}: ").strip()
+        except KeyboardInterrupt:
+            print("\nLogin process aborted by user.")
+            app_log.log_event("APP_EXIT_LIVE", "ABORTED", f"Login aborted by user for {spec.label}.")
+            sys.exit(1)
 
-            if not user_provided_request_token:
-                print("No request_token provided for Zerodha. Exiting.")
-                logger.log_trade(strategy_name="SYSTEM", symbol="ZERODHA", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="FAILURE", remarks="No request_token provided by user for Zerodha.")
-                sys.exit(1)
-            access_token = broker_api.login(request_token_override=user_provided_request_token)
-
-    elif ACTIVE_BROKER == "upstox":
-        if UPSTOX_API_KEY == "YOUR_UPSTOX_API_KEY_HERE" or UPSTOX_API_SECRET == "YOUR_UPSTOX_API_SECRET_HERE":
-            print("\nERROR: Upstox API Key or Secret not configured in config.py for active broker 'upstox'.")
-            logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="FAILURE", remarks="Upstox API Key/Secret not configured.")
+        if not user_provided_token:
+            print(f"No {spec.token_label} provided for {spec.label}. Exiting.")
+            app_log.log_event("APP_EXIT_LIVE", "FAILURE", f"No {spec.token_label} provided by user for {spec.label}.")
             sys.exit(1)
+        access_token = broker_api.login(**{spec.override_kwarg: user_provided_token})
 
-        broker_api = UpstoxAPI(api_key=UPSTOX_API_KEY, api_secret=UPSTOX_API_SECRET, redirect_uri=UPSTOX_REDIRECT_URI, logger=logger)
-        access_token = broker_api.login() # Upstox's login flow (tries stored token first)
+    return broker_api, access_token
 
-        if not access_token: # Upstox specific re-prompt for auth_code
-            print("\n--- LOGIN REQUIRED for Upstox (Live Mode) ---")
-            login_url = broker_api.get_login_url()
-            print(f"1. Open this URL in your browser: {login_url}")
-            print("2. Login with your Upstox credentials and authorize the app.")
-            print("3. After successful authorization, you will be redirected to your redirect_uri with an 'code' (auth_code) in the URL.")
-            print("   Example: YOUR_REDIRECT_URI?code=THIS_IS_YOUR_AUTH_CODE")
-            try:
-                user_provided_auth_code = input("\n4. Enter the 'code' (auth_code) here: ").strip()
-            except KeyboardInterrupt:
-                print("\nLogin process aborted by user.")
-                logger.log_trade(strategy_name="SYSTEM", symbol="UPSTOX", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="ABORTED", remarks="Login aborted by user.")
-                sys.exit(1)
 
-            if not user_provided_auth_code:
-                print("No auth_code provided for Upstox. Exiting.")
-                logger.log_trade(strategy_name="SYSTEM", symbol="UPSTOX", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="FAILURE", remarks="No auth_code provided by user for Upstox.")
-                sys.exit(1)
-            access_token = broker_api.login(auth_code_override=user_provided_auth_code)
-    else:
-        print(f"ERROR: Invalid ACTIVE_BROKER setting '{ACTIVE_BROKER}' in config.py. Must be 'zerodha' or 'upstox'.")
-        logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_EXIT_LIVE", quantity=0, price=0, order_type="-", status="FAILURE", remarks=f"Invalid ACTIVE_BROKER: {ACTIVE_BROKER}")
+def run_live_trading_flow(logger, app_log, args):
+    print("--- Starting Algo Trading System (Live Trading Mode) ---")
+    app_log.log_event("APP_START_LIVE", "SUCCESS", "Application started in live trading mode.")
+
+    spec = BROKER_SPECS.get(ACTIVE_BROKER)
+    if spec is None:
+        print(f"ERROR: Invalid ACTIVE_BROKER setting '{ACTIVE_BROKER}' in config.py. Must be one of: {', '.join(BROKER_SPECS)}.")
+        app_log.log_event("APP_EXIT_LIVE", "FAILURE", f"Invalid ACTIVE_BROKER: {ACTIVE_BROKER}")
         sys.exit(1)
+    broker_api, access_token = _do_login(spec, logger, app_log)
         
     if access_token:
         print(f"\n--- Login Successful for {ACTIVE_BROKER.upper()} (Live Mode)! ---")
-        logger.log_trade(strategy_name="SYSTEM", symbol=ACTIVE_BROKER.upper(), exchange="-", action="LOGIN_LIVE", quantity=0, price=0, order_type="-", status="SUCCESS", remarks=f"User {broker_api.user_id if hasattr(broker_api, 'user_id') else 'N/A'} logged in via {ACTIVE_BROKER}.")
+        app_log.log_event("LOGIN_LIVE", "SUCCESS", f"User {broker_api.user_id if hasattr(broker_api, 'user_id') else 'N/A'} logged in via {ACTIVE_BROKER}.")
         
-        # Initial account details display
-        run_manual_tests(broker_api) 
+        # Initial account details display (skippable for automated launches)
+        if not args.skip_manual_tests:
+            run_manual_tests(broker_api)
         
         print("\n--- Starting Live Position Tracking (Ctrl+C to stop) ---")
         try:
@@ -157,7 +283,7 @@ def run_live_trading_flow(logger):
                 iterations += 1
                 print(f"\n--- Position Update #{iterations} at {time.strftime('%Y-%m-%d %H:%M:%S')} ---")
                 
-                positions_data = broker_api.get_positions()
+                positions_data = _fetch_with_retry(broker_api.get_positions)
                 net_positions = []
                 day_positions = []
 
@@ -166,23 +292,26 @@ def run_live_trading_flow(logger):
                     day_positions = positions_data.get('day', [])
                 else:
                     print("Could not fetch position data.")
-                    logger.log_trade(strategy_name="SYSTEM_LIVE", symbol="-", exchange="-", action="FETCH_POS_FAIL", quantity=0, price=0, order_type="-", status="WARNING", remarks="Failed to fetch positions")
+                    app_log.log_event("FETCH_POS_FAIL", "WARNING", "Failed to fetch positions")
 
                 if not net_positions and not day_positions:
                     print("No open positions.")
                 else:
-                    print("Net Positions:")
-                    if not net_positions: print("  None")
+                    # Build the whole frame first and emit it with a single write
+                    lines = ["Net Positions:"]
+                    if not net_positions: lines.append("  None")
                     for pos in net_positions:
-                        print(f"  Symbol: {pos['tradingsymbol']}, Qty: {pos['quantity']}, Avg: {pos['average_price']:.2f}, "
-                              f"LTP: {pos.get('last_price', 0):.2f}, P&L: {pos['pnl']:.2f}, "
-                              f"Day P&L: {pos.get('day_pnl', pos.get('pnl'))}") # Use 'pnl' if 'day_pnl' not present
+                        lines.append(f"  Symbol: {pos['tradingsymbol']}, Qty: {pos['quantity']}, Avg: {pos['average_price']:.2f}, "
+                                     f"LTP: {pos.get('last_price', 0):.2f}, P&L: {pos['pnl']:.2f}, "
+                                     f"Day P&L: {pos.get('day_pnl', pos.get('pnl'))}") # Use 'pnl' if 'day_pnl' not present
 
-                    print("Day Positions (Intraday):")
-                    if not day_positions: print("  None")
+                    lines.append("Day Positions (Intraday):")
+                    if not day_positions: lines.append("  None")
                     for pos in day_positions:
-                         print(f"  Symbol: {pos['tradingsymbol']}, Qty: {pos['quantity']}, Avg: {pos['average_price']:.2f}, "
-                               f"LTP: {pos.get('last_price',0):.2f}, P&L: {pos['pnl']:.2f}")
+                        lines.append(f"  Symbol: {pos['tradingsymbol']}, Qty: {pos['quantity']}, Avg: {pos['average_price']:.2f}, "
+                                     f"LTP: {pos.get('last_price', 0):.2f}, P&L: {pos['pnl']:.2f}")
+                    sys.stdout.write("\n".join(lines) + "\n")
+                    sys.stdout.flush()
                 
                 # Fetch and display available funds/margin (optional enhancement)
                 # margins = broker_api.get_margins()
@@ -200,10 +329,10 @@ def run_live_trading_flow(logger):
 
         except KeyboardInterrupt:
             print("\n--- Live Position Tracking stopped by user (Ctrl+C). ---")
-            logger.log_trade(strategy_name="SYSTEM_LIVE", symbol="-", exchange="-", action="TRACKING_STOP_USER", quantity=0, price=0, order_type="-", status="INFO", remarks="Position tracking stopped by user.")
+            app_log.log_event("TRACKING_STOP_USER", "INFO", "Position tracking stopped by user.")
         except Exception as e:
             print(f"\n--- An error occurred during live position tracking: {e} ---")
-            logger.log_trade(strategy_name="SYSTEM_LIVE", symbol="-", exchange="-", action="TRACKING_ERROR", quantity=0, price=0, order_type="-", status="ERROR", remarks=str(e))
+            app_log.log_event("TRACKING_ERROR", "ERROR", str(e))
         
         print("\n--- Live Position Tracking Finished ---")
 
@@ -213,11 +342,11 @@ def run_live_trading_flow(logger):
 
     else: # Login failed
         print(f"\n--- Login Failed for {ACTIVE_BROKER.upper()} (Live Mode). ---")
-        logger.log_trade(strategy_name="SYSTEM", symbol=ACTIVE_BROKER.upper(), exchange="-", action="LOGIN_LIVE_FAIL", quantity=0, price=0, order_type="-", status="FAILURE", remarks=f"Login failed for {ACTIVE_BROKER}")
+        app_log.log_event("LOGIN_LIVE_FAIL", "FAILURE", f"Login failed for {ACTIVE_BROKER}")
         # sys.exit(1) # Not exiting here, just logging
 
     print("\n--- Algo Trading System (Live Trading Mode) Finished ---")
-    logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_END_LIVE", quantity=0, price=0, order_type="-", status="SUCCESS", remarks="Application finished live mode.")
+    app_log.log_event("APP_END_LIVE", "SUCCESS", "Application finished live mode.")
 
 
 def square_off_all_mis_positions(broker_api, logger):
@@ -284,9 +413,41 @@ def square_off_all_mis_positions(broker_api, logger):
     print("--- MIS Positions Square Off Routine Finished ---")
 
 
-def run_backtest_flow(logger):
+# Historical data file types, fastest to load first
+DATA_FILE_SUFFIXES = ('.npy', '.parquet', '.csv')
+# Synthetic data written by run_backtest_flow; only used when a symbol has no real data file
+DUMMY_DATA_SUFFIX = '.dummy.npy'
+_DATA_INDEX = {} # symbol -> Path of its preferred historical data file in BACKTEST_DATA_DIR
+
+
+def _index_data_dir():
+    """
+    Scans BACKTEST_DATA_DIR once (a single directory listing instead of a stat
+    per lookup) and maps each symbol to its fastest-loading data file, falling
+    back to a generated dummy file only when no real one exists.
+    """
+    if not _DATA_INDEX and os.path.isdir(BACKTEST_DATA_DIR):
+        dummies = {}
+        for entry in os.scandir(BACKTEST_DATA_DIR):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith(DUMMY_DATA_SUFFIX):
+                dummies[entry.name[:-len(DUMMY_DATA_SUFFIX)]] = Path(entry.path)
+                continue
+            symbol, suffix = os.path.splitext(entry.name)
+            if suffix not in DATA_FILE_SUFFIXES:
+                continue
+            current = _DATA_INDEX.get(symbol)
+            if current is None or DATA_FILE_SUFFIXES.index(suffix) < DATA_FILE_SUFFIXES.index(current.suffix):
+                _DATA_INDEX[symbol] = Path(entry.path)
+        for symbol, path in dummies.items():
+            _DATA_INDEX.setdefault(symbol, path)
+    return _DATA_INDEX
+
+
+def run_backtest_flow(logger, app_log, args):
     print("--- Starting Algo Trading System (Backtest Mode) ---")
-    logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_START_BACKTEST", quantity=0, price=0, order_type="-", status="INFO", remarks="Application started in backtest mode.")
+    app_log.log_event("APP_START_BACKTEST", "INFO", "Application started in backtest mode.")
 
     # 1. Select Strategy and Parameters
     # For now, hardcoding SmaCrossoverStrategy and its params from config
@@ -306,49 +467,48 @@ def run_backtest_flow(logger):
     print(f"Strategy '{strategy_instance.name}' initialized for backtesting.")
 
     # 2. Define Backtest Parameters
-    # These should ideally come from config.py or command-line args
-    # Using example values for symbol and data file path
+    # Command-line args (--symbol/--start/--end) override the config defaults
     # Ensure BACKTEST_DATA_DIR ends with a '/' in config.py
-    backtest_symbol = "DUMMY_TEST_EQ" # Example symbol, user should have DUMMY_TEST_EQ.csv
-    historical_data_file = os.path.join(BACKTEST_DATA_DIR, f"{backtest_symbol}.csv") 
+    backtest_symbol = args.symbol or "DUMMY_TEST_EQ" # Example symbol, user should have DUMMY_TEST_EQ.csv
+    start_date = args.start or BACKTEST_START_DATE
+    end_date = args.end or BACKTEST_END_DATE
+    historical_data_file = _index_data_dir().get(backtest_symbol)
     
     # Check if the historical data file exists
-    if not os.path.exists(historical_data_file):
-        print(f"ERROR: Historical data file not found: {historical_data_file}")
+    if historical_data_file is None:
+        print(f"ERROR: Historical data file not found for {backtest_symbol} in {BACKTEST_DATA_DIR} ({'/'.join(DATA_FILE_SUFFIXES)})")
         print("Please ensure the file exists or update BACKTEST_DATA_DIR and symbol.")
         # Create a dummy file if it doesn't exist, for demonstration purposes
         # This part should ideally be handled by user providing data.
-        print(f"Attempting to create a dummy CSV for {backtest_symbol} for testing...")
+        # The synthetic data is written as a typed NumPy record array so the engine
+        # can memory-map it directly instead of tokenizing CSV text and parsing dates.
+        print(f"Attempting to create a dummy data file for {backtest_symbol} for testing...")
         os.makedirs(BACKTEST_DATA_DIR, exist_ok=True)
-        dummy_header = "Date,Open,High,Low,Close,Volume\n" # Note: Date format for pd.to_datetime
-        dummy_data_rows = [
-            "2023-01-01 09:15:00,100,102,99,100,1000\n",
-            "2023-01-02 09:15:00,100,102,99,101.5,1200\n",
-            "2023-01-03 09:15:00,101.5,104,101,103,1100\n",
-            "2023-01-04 09:15:00,103,103,95,98,1500\n",
-            "2023-01-05 09:15:00,98,99,97,98.5,1300\n",
-            "2023-01-06 09:15:00,98.5,105,98,104,1400\n",
-        ]
+        dummy_data = np.array([
+            ("2023-01-01T09:15:00", 100, 102, 99, 100, 1000),
+            ("2023-01-02T09:15:00", 100, 102, 99, 101.5, 1200),
+            ("2023-01-03T09:15:00", 101.5, 104, 101, 103, 1100),
+            ("2023-01-04T09:15:00", 103, 103, 95, 98, 1500),
+            ("2023-01-05T09:15:00", 98, 99, 97, 98.5, 1300),
+            ("2023-01-06T09:15:00", 98.5, 105, 98, 104, 1400),
+        ], dtype=DUMMY_DATA_DTYPE)
+        dummy_data_file = Path(BACKTEST_DATA_DIR, f"{backtest_symbol}{DUMMY_DATA_SUFFIX}")
         try:
-            with open(historical_data_file, 'w') as f:
-                f.write(dummy_header)
-                for row in dummy_data_rows:
-                    f.write(row)
-            print(f"Dummy CSV created at: {historical_data_file}. Please replace with actual data.")
+            np.save(dummy_data_file, dummy_data)
+            historical_data_file = _DATA_INDEX[backtest_symbol] = dummy_data_file
+            print(f"Dummy data created at: {historical_data_file}. Please replace with actual data (and delete this file).")
         except Exception as e:
-            print(f"Could not create dummy CSV: {e}")
-            logger.log_trade(strategy_name="SYSTEM", symbol=backtest_symbol, exchange="BACKTEST", action="APP_EXIT_BACKTEST", quantity=0, price=0, order_type="-", status="FAILURE", remarks=f"Historical data file not found and dummy creation failed: {historical_data_file}")
+            print(f"Could not create dummy data: {e}")
+            app_log.log_event("APP_EXIT_BACKTEST", "FAILURE", f"Historical data file not found for {backtest_symbol} and dummy creation failed: {dummy_data_file}")
             sys.exit(1)
             
     # 3. Run the backtest using strategy's run_backtest method
     print(f"Starting backtest for {backtest_symbol} using data from {historical_data_file}...")
     strategy_instance.run_backtest(
-        historical_data_source=historical_data_file,
-        strategy=strategy_instance,
+        historical_data_source=str(historical_data_file),
         initial_capital=BACKTEST_INITIAL_CAPITAL,
-        start_date=BACKTEST_START_DATE,
-        end_date=BACKTEST_END_DATE,
-        trade_logger=logger,
+        start_date=start_date,
+        end_date=end_date,
         symbol=backtest_symbol,
         stop_loss_percent=strategy_params.get('stop_loss_percent'), # From strategy_params
         target_percent=strategy_params.get('target_percent'),     # From strategy_params
@@ -360,29 +520,78 @@ def run_backtest_flow(logger):
     )
 
     print("\n--- Algo Trading System (Backtest Mode) Finished ---")
-    logger.log_trade(strategy_name="SYSTEM", symbol=backtest_symbol, exchange="BACKTEST", action="APP_END_BACKTEST", quantity=0, price=0, order_type="-", status="SUCCESS", remarks="Backtest finished.")
+    app_log.log_event("APP_END_BACKTEST", "SUCCESS", f"Backtest finished for {backtest_symbol}.")
+
+
+class Mode(enum.Enum):
+    LIVE = "live"
+    BACKTEST = "backtest"
+
+
+MODE_RUNNERS = {
+    Mode.LIVE: run_live_trading_flow,
+    Mode.BACKTEST: run_backtest_flow,
+}
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Algo Trading System")
+    parser.add_argument("--mode", type=Mode, default=Mode.BACKTEST,
+                        help="Run mode: 'live' or 'backtest' (default: backtest)")
+    parser.add_argument("--symbol", help="Backtest symbol (default: DUMMY_TEST_EQ)")
+    parser.add_argument("--start", help="Backtest start date, overrides BACKTEST_START_DATE")
+    parser.add_argument("--end", help="Backtest end date, overrides BACKTEST_END_DATE")
+    parser.add_argument("--skip-manual-tests", action="store_true",
+                        help="Live mode: skip the startup account info checks")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="Detail of per-trade (INFO) and per-signal (DEBUG) messages (default: WARNING)")
+    return parser.parse_args(argv)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records as they are. The stock QueueHandler.prepare() formats each record
+    (merging msg % args) in the emitting thread; here that is left to the listener.
+    Log calls must therefore not pass args they mutate afterwards.
+    """
+    def prepare(self, record):
+        return record
+
+
+def _start_queue_logging(level):
+    """
+    Routes log records through a queue to a background thread that formats them and
+    writes them to stderr, so a strategy/engine log call only enqueues the record.
+    Returns the QueueListener; stop() it to flush the remaining records.
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, console)
+    logging.basicConfig(level=level, format="%(message)s", handlers=[_DeferredQueueHandler(log_queue)])
+    listener.start()
+    return listener
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log_listener = _start_queue_logging(args.log_level)
+
     # Initialize Trade Logger (common for both modes)
     # Ensure TRADE_LOG_FILE and DAILY_SUMMARY_FILE are defined in config
     logger = TradeLogger(trade_log_file=TRADE_LOG_FILE, 
                          daily_summary_file=DAILY_SUMMARY_FILE)
     print("TradeLogger initialized.")
+    # Application events (start/end, login, config errors) go to their own narrow log
+    app_log = AppEventLogger(event_log_file=APPLICATION_LOG_FILE)
 
     # --- Mode Selection ---
-    # Simple mode selection: Change this variable to switch mode.
-    # Future: Use command-line arguments (e.g., `python main.py --mode backtest`)
-    CURRENT_MODE = "backtest" # Options: "live", "backtest" 
-
-    if CURRENT_MODE == "live":
-        run_live_trading_flow(logger)
-    elif CURRENT_MODE == "backtest":
-        run_backtest_flow(logger)
-    else:
-        print(f"ERROR: Unknown mode '{CURRENT_MODE}'. Valid modes are 'live' or 'backtest'.")
-        logger.log_trade(strategy_name="SYSTEM", symbol="-", exchange="-", action="APP_EXIT", quantity=0, price=0, order_type="-", status="FAILURE", remarks=f"Unknown mode: {CURRENT_MODE}")
-        sys.exit(1)
+    # e.g. `python main.py --mode live` or `python main.py --mode backtest --symbol INFY`
+    try:
+        MODE_RUNNERS[args.mode](logger, app_log, args)
+    finally:
+        logger.close()
+        log_listener.stop() # Drains queued records before exit
 
 if __name__ == "__main__":
     main()
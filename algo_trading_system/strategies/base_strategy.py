@@ -1,16 +1,19 @@
 # algo_trading_system/strategies/base_strategy.py
+import logging
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd # Ensure pandas is imported if not already
+from .signals import Signal, ACTION_TO_SIGNAL
 
-# Assuming BacktestEngine will be importable from core
-# Adjust path if necessary based on your project structure and how it's run
-try:
-    from ..core.backtest_engine import BacktestEngine
-except ImportError:
-    print("Could not import BacktestEngine in BaseStrategy. Ensure it's accessible.")
-    BacktestEngine = None # Placeholder if import fails, real run from main.py should ensure it's available
+log = logging.getLogger(__name__)
 
 class BaseStrategy(ABC):
+    # No per-instance __dict__; subclasses should declare their own __slots__ (or __slots__ = ())
+    __slots__ = ('name', 'broker_api', 'logger', 'params')
+
+    # Set to True in subclasses that implement _signals_kernel (see generate_signals_batch)
+    USE_NUMBA_KERNEL = False
+
     def __init__(self, name, broker_api, logger, params=None): # logger is TradeLogger
         self.name = name
         self.broker_api = broker_api # For live trading
@@ -33,10 +36,61 @@ class BaseStrategy(ABC):
             (dict or None): A dictionary representing the signal, e.g.,
                             {'action': 'BUY', 'price': entry_price, 'sl': sl_price, 'tp': tp_price}
                             or {'action': 'SELL', 'price': exit_price}
+                            A bare Signal direction is also accepted (expanded via build_signal).
                             Return None or {} if no signal.
         """
         pass
 
+    def generate_signals_batch(self, historical_data: pd.DataFrame):
+        """
+        Optional vectorised counterpart of generate_signals for backtests.
+        Strategies whose signals can be computed over the whole history at once
+        should override this; the BacktestEngine then calls it a single time
+        instead of calling generate_signals once per bar.
+
+        Args:
+            historical_data (pd.DataFrame): The full backtest data (OHLCV) with a DateTimeIndex.
+
+        Returns:
+            (np.ndarray or None): int8 array with one entry per row of historical_data:
+                                  Signal.BUY (+1), Signal.SELL (-1) or Signal.HOLD (0).
+                                  None (the default) means "not supported" and the
+                                  engine falls back to per-bar generate_signals.
+
+        Strategies with USE_NUMBA_KERNEL = True get this for free by providing a
+        compiled kernel over float64 column arrays, e.g.:
+
+            from core.jit import njit
+
+            USE_NUMBA_KERNEL = True
+
+            @staticmethod
+            @njit(cache=True)
+            def _signals_kernel(close, high, low, open_, volume, window):
+                ...  # return an int8 array of len(close)
+
+            def _kernel_args(self):
+                return (self.params['window'],)
+        """
+        if not self.USE_NUMBA_KERNEL:
+            return None
+        columns = [historical_data[col].to_numpy(dtype=np.float64, copy=False) if col in historical_data
+                   else np.zeros(len(historical_data)) # volume is optional
+                   for col in ('close', 'high', 'low', 'open', 'volume')]
+        return type(self)._signals_kernel(*columns, *self._kernel_args()).astype(np.int8, copy=False)
+
+    def _kernel_args(self):
+        """Numeric parameters appended to the _signals_kernel call (numba kernels cannot take dicts)."""
+        return ()
+
+    def build_signal(self, direction, price):
+        """
+        Turns an entry of the generate_signals_batch array into the signal dict
+        that generate_signals would have returned for that bar. Override to add
+        strategy specific fields such as 'sl_price'/'tp_price' or 'reason'.
+        """
+        return {'action': 'BUY' if direction > 0 else 'SELL', 'price': price}
+
     @abstractmethod
     def execute_trade(self, signal, symbol, quantity, exchange='NSE', product='CNC', order_type='MARKET', stop_loss=None, target=None):
         """
@@ -47,7 +101,7 @@ class BaseStrategy(ABC):
         pass
         
     def run_backtest(self, 
-                     historical_data_source, # Path to CSV or DataFrame
+                     historical_data_source, # Path to CSV/.npy/.parquet or DataFrame
                      symbol, 
                      initial_capital,
                      start_date,
@@ -56,12 +110,14 @@ class BaseStrategy(ABC):
                      stop_loss_percent=None, # Default SL %
                      target_percent=None,    # Default TP %
                      brokerage_percent=0.0,
-                     slippage_percent=0.0):
+                     slippage_percent=0.0,
+                     allow_pyramiding=False,
+                     max_pyramid_entries=1):
         """
         Runs a backtest of the strategy using the BacktestEngine.
 
         Args:
-            historical_data_source (str or pd.DataFrame): Path to CSV data file or DataFrame.
+            historical_data_source (str or pd.DataFrame): Path to CSV/.npy/.parquet data file or DataFrame.
             symbol (str): The trading symbol.
             initial_capital (float): Starting capital for the backtest.
             start_date (str or datetime): Backtest start date.
@@ -71,17 +127,17 @@ class BaseStrategy(ABC):
             target_percent (float, optional): Default target if not set by strategy signals.
             brokerage_percent (float, optional): Brokerage fee per trade.
             slippage_percent (float, optional): Slippage per trade.
+            allow_pyramiding (bool, optional): Whether to allow pyramiding entries.
+            max_pyramid_entries (int, optional): Max number of entries if pyramiding.
         """
-        print(f"--- Preparing backtest for strategy '{self.name}' on {symbol} ---")
+        # Imported here rather than at module load: core.backtest_engine imports
+        # strategies, and live-only runs never need the engine.
+        from core.backtest_engine import BacktestEngine
+
+        log.info("--- Preparing backtest for strategy '%s' on %s ---", self.name, symbol)
 
-        if BacktestEngine is None:
-            print("ERROR: BacktestEngine class not imported. Cannot run backtest.")
-            if self.logger:
-                self.logger.log_trade(self.name, symbol, "BACKTEST", "SETUP_FAIL", 0,0,"-", status="FAILURE", remarks="BacktestEngine not available")
-            return None
-        
         if self.logger is None:
-            print("WARNING: TradeLogger not provided to strategy. Backtest results might not be fully logged.")
+            log.warning("TradeLogger not provided to strategy. Backtest results might not be fully logged.")
             # Optionally, create a dummy logger here if essential, but better to ensure it's passed.
 
         engine = BacktestEngine(
@@ -96,15 +152,17 @@ class BaseStrategy(ABC):
             target_percent=target_percent,
             brokerage_percent=brokerage_percent,
             slippage_percent=slippage_percent,
-            qty_per_trade=qty_per_trade
+            qty_per_trade=qty_per_trade,
+            allow_pyramiding=allow_pyramiding,
+            max_pyramid_entries=max_pyramid_entries
         )
         
         results = engine.run() # This will execute the backtest
         
         if results is not None:
-            print(f"--- Backtest completed for strategy '{self.name}' on {symbol}. Total trades logged: {len(results)} ---")
+            log.info("--- Backtest completed for strategy '%s' on %s. Total trades logged: %d ---", self.name, symbol, len(results))
         else:
-            print(f"--- Backtest for strategy '{self.name}' on {symbol} encountered issues or produced no trades. ---")
+            log.warning("--- Backtest for strategy '%s' on %s encountered issues or produced no trades. ---", self.name, symbol)
         
         return results # The BacktestEngine.run() returns the list of trades
 
@@ -116,7 +174,7 @@ class BaseStrategy(ABC):
         This would typically involve a loop that fetches real-time data.
         SL/TP prices should come from the signal generated by generate_signals.
         """
-        print(f"Running live strategy '{self.name}' for {symbol} (simulated iteration)...")
+        log.info("Running live strategy '%s' for %s (simulated iteration)...", self.name, symbol)
         
         # In a real live trading loop, you'd get live market data here.
         # For this example, we'll assume generate_signals can work with None or mock data if needed for a single pass.
@@ -125,9 +183,20 @@ class BaseStrategy(ABC):
         
         signal_details = self.generate_signals(historical_data=mock_live_data) 
 
-        if signal_details and isinstance(signal_details, dict) and signal_details.get('action') in ['BUY', 'SELL']:
-            action = signal_details.get('action')
-            print(f"Live: Signal {action} for {symbol}. Attempting to execute trade.")
+        direction = Signal.HOLD
+        if isinstance(signal_details, (int, np.integer)):
+            # Bare direction: expand it into the signal dict, priced at the latest close
+            direction = Signal(int(signal_details))
+            last_price = None
+            if mock_live_data is not None and 'close' in mock_live_data and len(mock_live_data):
+                last_price = float(mock_live_data['close'].iloc[-1])
+            signal_details = self.build_signal(direction, last_price) if direction else None
+        elif signal_details and isinstance(signal_details, dict):
+            direction = ACTION_TO_SIGNAL.get(signal_details.get('action'), Signal.HOLD)
+
+        if direction:
+            action = direction.name
+            log.info("Live: Signal %s for %s. Attempting to execute trade.", action, symbol)
             
             # Extract SL/TP prices from the signal if present
             sl_price_from_signal = signal_details.get('sl_price')
@@ -164,8 +233,8 @@ class BaseStrategy(ABC):
             #     # self.execute_trade({'action': 'SELL' if action=='BUY' else 'BUY', ...}, order_type='SL-M', stop_loss_price=sl_price_from_signal)
 
         elif signal_details: 
-             print(f"Live: Signal {signal_details} for {symbol}. No trade action taken.")
+            log.info("Live: Signal %s for %s. No trade action taken.", signal_details, symbol)
         else:
-            print(f"Live: No signal generated for {symbol}.")
+            log.info("Live: No signal generated for %s.", symbol)
             
-        print(f"Live strategy '{self.name}' iteration complete (simulated).")
+        log.info("Live strategy '%s' iteration complete (simulated).", self.name)
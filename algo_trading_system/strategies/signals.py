@@ -0,0 +1,14 @@
+# algo_trading_system/strategies/signals.py
+from enum import IntEnum
+
+class Signal(IntEnum):
+    """
+    Trade direction as an integer, so hot loops can test `if signal:` and use the
+    sign directly (+1 BUY, -1 SELL). Matches the int8 arrays of generate_signals_batch.
+    """
+    HOLD = 0
+    BUY = 1
+    SELL = -1
+
+# Signal dict 'action' strings -> Signal
+ACTION_TO_SIGNAL = {'BUY': Signal.BUY, 'SELL': Signal.SELL}
@@ -1,8 +1,96 @@
 # algo_trading_system/strategies/sma_crossover_strategy.py
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy # Assuming BaseStrategy is in the same directory
+from core.jit import njit, prange, NUMBA_AVAILABLE
+
+log = logging.getLogger(__name__)
+
+
+@njit(cache=True, nogil=True)
+def _sma_side(short_sma, long_sma):
+    # +1 short above long, -1 below, 0 equal. A crossover is any bar where the
+    # side changes to a non-zero value, which equals the classic
+    # "prev_short <= prev_long and short > long" (and mirrored SELL) test without branches.
+    return int(short_sma > long_sma) - int(short_sma < long_sma)
+
+
+@njit(inline='always')
+def _sma_crossover_scan(close, short_w, long_w):
+    # Shared body of _sma_crossover_kernel and the _specialized_kernel variants;
+    # inlined into each caller so constant windows can be folded in.
+    n = close.shape[0]
+    out = np.zeros(n, dtype=np.int8)
+    if n < long_w:
+        return out
+    # No SMA exists before bar long_w - 1, so the window sums are built once there
+    long_sum = 0.0
+    for j in range(long_w):
+        long_sum += close[j]
+    short_sum = 0.0
+    for j in range(long_w - short_w, long_w):
+        short_sum += close[j]
+    prev_side = _sma_side(short_sum / short_w, long_sum / long_w)
+    for i in range(long_w, n):
+        short_sum += close[i] - close[i - short_w]
+        long_sum += close[i] - close[i - long_w]
+        side = _sma_side(short_sum / short_w, long_sum / long_w)
+        out[i] = side * (side != prev_side)
+        prev_side = side
+    return out
+
+
+@njit(cache=True, nogil=True)
+def _sma_crossover_kernel(close, short_w, long_w):
+    """
+    Single pass SMA crossover over a float64 close array with running window sums.
+    Returns int8 signals (+1 BUY, -1 SELL, 0 none) matching generate_signals bar by bar.
+    nogil lets several symbols be scanned from parallel threads.
+    """
+    return _sma_crossover_scan(close, short_w, long_w)
+
+
+_KERNEL_CACHE = {} # (short_w, long_w) -> specialized kernel
+
+
+def _specialized_kernel(short_w, long_w):
+    """
+    Returns _sma_crossover_kernel specialised for one (short_w, long_w) pair, taking
+    only the close array. Compiled on first use, then reused.
+    """
+    key = (short_w, long_w)
+    kernel = _KERNEL_CACHE.get(key)
+    if kernel is None:
+        short_w, long_w = int(short_w), int(long_w)
+
+        def kernel(close):
+            # numba freezes closure variables as compile-time constants, so the
+            # window offsets fold and the warm-up sums can be unrolled
+            return _sma_crossover_scan(close, short_w, long_w)
+
+        # No cache=True: numba cannot cache closures
+        kernel = _KERNEL_CACHE[key] = njit(nogil=True)(kernel)
+    return kernel
+
+
+@njit(cache=True, nogil=True, parallel=True)
+def _sma_crossover_batch(closes, short_w, long_w, out):
+    """
+    Runs _sma_crossover_kernel for every row of a (n_symbols, n_bars) float64 close
+    array, spreading the symbols over threads (each row is independent). Signals are
+    written into the matching rows of the int8 array out, which is also returned.
+    """
+    for sym in prange(closes.shape[0]):
+        out[sym, :] = _sma_crossover_kernel(closes[sym], short_w, long_w)
+    return out
 
 class SmaCrossoverStrategy(BaseStrategy):
+    __slots__ = ('short_window', 'long_window', '_prev_side',
+                 '_buy_sl_mult', '_buy_tp_mult', '_default_exchange', '_default_product', '_default_order_type', '_order_template',
+                 '_ring', '_ring_idx', '_ring_count', '_short_sum', '_long_sum', '_bars_seen')
+
     def __init__(self, name, broker_api, logger, params=None):
         super().__init__(name, broker_api, logger, params)
         self.short_window = self.params.get('short_window', 20)
@@ -14,10 +102,39 @@ class SmaCrossoverStrategy(BaseStrategy):
         if self.short_window >= self.long_window:
             raise ValueError("Short SMA window must be less than Long SMA window.")
 
-        # To keep track of the previous state of SMAs to detect crossover
-        self.short_sma_prev = None
-        self.long_sma_prev = None
-        self.data_buffer = pd.DataFrame() # To accumulate enough data for SMA calculation
+        # Params read per signal/order, looked up once (they don't change during a run)
+        sl_percentage = self.params.get('stop_loss_percent') # e.g., 2 for 2%
+        tp_percentage = self.params.get('target_percent')    # e.g., 4 for 4%
+        # SL/TP price = entry price * multiplier (None when the level is not configured)
+        self._buy_sl_mult = 1 - (sl_percentage / 100.0) if sl_percentage else None
+        self._buy_tp_mult = 1 + (tp_percentage / 100.0) if tp_percentage else None
+        self._default_exchange = self.params.get('default_exchange', 'NSE')
+        self._default_product = self.params.get('default_product_type', 'MIS')
+        self._default_order_type = self.params.get('default_order_type', 'MARKET')
+        # Broker order fields with the defaults filled in; execute_trade copies it per order
+        self._order_template = {
+            "variety": "regular", # Could be 'amo'. BO/CO varieties are more complex.
+            "exchange": self._default_exchange.upper(),
+            "tradingsymbol": None,
+            "transaction_type": None,
+            "quantity": 0,
+            "product": self._default_product.upper(),
+            "order_type": self._default_order_type.upper(),
+        }
+
+        # Side of the short SMA relative to the long one on the previous bar (see _sma_side),
+        # None until both SMAs have been available for a bar
+        self._prev_side = None
+
+        # Streaming SMA state: a ring buffer of the last long_window closes (which also
+        # covers the short window) and both running sums, so generate_signals updates
+        # the SMAs in O(1) per bar with memory fixed at long_window floats
+        self._ring = np.empty(self.long_window, dtype=np.float64)
+        self._ring_idx = 0   # Slot the next close is written to (holds the oldest once full)
+        self._ring_count = 0 # Closes stored, up to long_window
+        self._short_sum = 0.0
+        self._long_sum = 0.0
+        self._bars_seen = 0 # Length of the history seen on the previous call
 
         print(f"SmaCrossoverStrategy '{self.name}' initialized with Short Window: {self.short_window}, Long Window: {self.long_window}")
 
@@ -32,54 +149,114 @@ class SmaCrossoverStrategy(BaseStrategy):
             # print(f"{self.name}: Historical data is empty or missing 'close' column.")
             return None 
 
+        # The historical_data passed from BacktestEngine is cumulative, one bar longer
+        # per call. Anything else (first call, a new series) re-seeds the SMA state.
+        # Plain ndarray view of the closes: positional access without pandas indexers
+        closes = historical_data['close'].to_numpy()
+        n_bars = len(closes)
+        if n_bars != self._bars_seen + 1:
+            self._reseed_sma_state(closes[-self.long_window - 1:-1])
+        self._bars_seen = n_bars
+
+        current_price = float(closes[-1]) # For signal price or SL/TP base
+        self._push_close(current_price)
+
         # For SMA calculation, we need at least `long_window` periods of data.
-        # The historical_data passed from BacktestEngine is cumulative.
-        if len(historical_data) < self.long_window:
-            # print(f"{self.name}: Not enough data for SMA calculation. Need {self.long_window}, have {len(historical_data)}")
+        if self._ring_count < self.long_window:
             return None # Not enough data to calculate long SMA
 
-        # Calculate SMAs using the provided historical_data
-        short_sma = historical_data['close'].rolling(window=self.short_window).mean().iloc[-1]
-        long_sma = historical_data['close'].rolling(window=self.long_window).mean().iloc[-1]
-        
-        current_price = historical_data['close'].iloc[-1] # For signal price or SL/TP base
-
-        signal = None
-        # Check for crossover only if we have previous SMA values
-        if self.short_sma_prev is not None and self.long_sma_prev is not None:
-            # BUY signal: Short SMA crosses above Long SMA
-            if self.short_sma_prev <= self.long_sma_prev and short_sma > long_sma:
-                print(f"{historical_data.index[-1]} - {self.name}: BUY signal. Short SMA ({short_sma:.2f}) crossed above Long SMA ({long_sma:.2f})")
-                signal = {'action': 'BUY', 'price': current_price}
-                
-                # Add SL/TP based on strategy parameters if they exist
-                sl_percentage = self.params.get('stop_loss_percent') # e.g., 2 for 2%
-                tp_percentage = self.params.get('target_percent')   # e.g., 4 for 4%
-
-                if sl_percentage:
-                    signal['sl_price'] = current_price * (1 - (sl_percentage / 100.0))
-                if tp_percentage:
-                    signal['tp_price'] = current_price * (1 + (tp_percentage / 100.0))
-                
-            # SELL signal: Short SMA crosses below Long SMA (to close a long position or open short)
-            elif self.short_sma_prev >= self.long_sma_prev and short_sma < long_sma:
-                print(f"{historical_data.index[-1]} - {self.name}: SELL signal. Short SMA ({short_sma:.2f}) crossed below Long SMA ({long_sma:.2f})")
-                signal = {
-                    'action': 'SELL',
-                    'price': current_price,
-                    'reason': 'SMA_CROSS_DOWN'
-                }
-                # If short selling, SL/TP would be calculated differently:
-                # sl_percentage = self.params.get('stop_loss_percent') 
-                # tp_percentage = self.params.get('target_percent')
-                # if sl_percentage: signal['sl_price'] = current_price * (1 + (sl_percentage / 100.0))
-                # if tp_percentage: signal['tp_price'] = current_price * (1 - (tp_percentage / 100.0))
-        
-        # Update previous SMA values for the next iteration
-        self.short_sma_prev = short_sma
-        self.long_sma_prev = long_sma
-        
-        return signal
+        short_sma = self._short_sum / self.short_window
+        long_sma = self._long_sum / self.long_window
+
+        side = _sma_side(short_sma, long_sma)
+        prev_side = self._prev_side
+        self._prev_side = side
+        # BUY when the short SMA moves above the long one, SELL when it moves below
+        # (to close a long position or open short); nothing on the first available bar
+        if prev_side is None or side == prev_side or not side:
+            return None
+
+        log.debug("%s - %s: %s signal. Short SMA (%.2f) crossed %s Long SMA (%.2f)", historical_data.index[-1], self.name,
+                  'BUY' if side > 0 else 'SELL', short_sma, 'above' if side > 0 else 'below', long_sma)
+        return self.build_signal(side, current_price)
+
+    def _push_close(self, close):
+        ring = self._ring
+        idx = self._ring_idx
+        if self._ring_count < self.long_window:
+            # Warming up: only store the close, no SMA arithmetic until the long window fills
+            ring[idx] = close
+            self._ring_idx = (idx + 1) % self.long_window
+            self._ring_count += 1
+            if self._ring_count == self.long_window: # ring_idx wrapped to 0, so ring is oldest first
+                self._long_sum = self._short_sum = 0.0
+                for c in ring:
+                    self._long_sum += c
+                for c in ring[self.long_window - self.short_window:]:
+                    self._short_sum += c
+            return
+        # Swap the oldest close of each window for the new one (ring[idx] is about to be overwritten)
+        self._short_sum += close - ring[(idx - self.short_window) % self.long_window]
+        self._long_sum += close - ring[idx]
+        ring[idx] = close
+        self._ring_idx = (idx + 1) % self.long_window
+
+    def _reseed_sma_state(self, prior_closes):
+        """Rebuilds the streaming state from the closes before the current bar."""
+        self._ring_idx = self._ring_count = 0
+        self._short_sum = self._long_sum = 0.0
+        for close in prior_closes:
+            self._push_close(close)
+        if self._ring_count == self.long_window:
+            self._prev_side = _sma_side(self._short_sum / self.short_window, self._long_sum / self.long_window)
+        else:
+            self._prev_side = None
+
+    def generate_signals_batch(self, historical_data: pd.DataFrame):
+        """
+        SMA crossover signals for the whole history in one pass. Uses the same
+        running-sum arithmetic as generate_signals, so it produces the same signals
+        as calling generate_signals bar by bar.
+        """
+        if historical_data.empty or 'close' not in historical_data.columns:
+            return np.zeros(len(historical_data), dtype=np.int8)
+
+        close = historical_data['close'].to_numpy(dtype=np.float64)
+        if NUMBA_AVAILABLE: # Compiled single pass, specialised for this strategy's windows
+            return _specialized_kernel(self.short_window, self.long_window)(close)
+        return _sma_crossover_kernel(close, self.short_window, self.long_window)
+
+    def generate_signals_multi(self, closes):
+        """
+        SMA crossover signals for many symbols at once, e.g. for a portfolio backtest.
+
+        Args:
+            closes (np.ndarray): (n_symbols, n_bars) close prices, oldest first in each row.
+
+        Returns:
+            np.ndarray: int8 (n_symbols, n_bars) signals, each row as generate_signals_batch would give.
+        """
+        closes = np.ascontiguousarray(closes, dtype=np.float64) # Bars contiguous per symbol
+        out = np.empty(closes.shape, dtype=np.int8)
+        return _sma_crossover_batch(closes, self.short_window, self.long_window, out)
+
+    def build_signal(self, direction, price):
+        if direction > 0:
+            signal = {'action': 'BUY', 'price': price}
+            # Add SL/TP based on strategy parameters if they exist
+            if self._buy_sl_mult is not None:
+                signal['sl_price'] = price * self._buy_sl_mult
+            if self._buy_tp_mult is not None:
+                signal['tp_price'] = price * self._buy_tp_mult
+            return signal
+
+        # SELL: closes a long position (short selling is not implemented)
+        # If short selling, SL/TP would be calculated differently:
+        # sl_percentage = self.params.get('stop_loss_percent') 
+        # tp_percentage = self.params.get('target_percent')
+        # if sl_percentage: signal['sl_price'] = price * (1 + (sl_percentage / 100.0))
+        # if tp_percentage: signal['tp_price'] = price * (1 - (tp_percentage / 100.0))
+        return {'action': 'SELL', 'price': price, 'reason': 'SMA_CROSS_DOWN'}
 
     def execute_trade(self, signal: dict, symbol: str, quantity: int, 
                           exchange: str = None, product: str = None, order_type: str = None,
@@ -95,40 +272,42 @@ class SmaCrossoverStrategy(BaseStrategy):
             """
             if not self.broker_api:
                 msg = f"{self.name}: Broker API not available. Cannot execute live trade."
-                print(msg)
-                if self.logger: self.logger.log_trade(self.name, symbol, exchange or 'NSE', signal.get('action', 'UNKNOWN'), quantity, signal.get('price',0), order_type or self.params.get('default_order_type', 'MARKET'), status="FAILURE", remarks="Broker API unavailable")
+                log.warning(msg)
+                if self.logger: self.logger.log_trade(self.name, symbol, exchange or 'NSE', signal.get('action', 'UNKNOWN'), quantity, signal.get('price',0), order_type or self._default_order_type, status="FAILURE", remarks="Broker API unavailable")
                 return None
 
             action = signal.get('action')
             if not action or action.upper() not in ["BUY", "SELL"]:
                 msg = f"{self.name}: Invalid or missing action in signal: {action}"
-                print(msg)
+                log.warning(msg)
                 if self.logger: self.logger.log_trade(self.name, symbol, exchange or 'NSE', str(action), quantity, 0, order_type, status="REJECTED", remarks=msg)
                 return None
 
             # Get defaults from strategy params if not provided in method call
-            current_exchange = exchange or self.params.get('default_exchange', 'NSE')
-            current_product = product or self.params.get('default_product_type', 'MIS') # Get from strategy params
-            current_order_type = order_type or self.params.get('default_order_type', 'MARKET') # Get from strategy params
+            current_exchange = exchange or self._default_exchange
+            current_product = product or self._default_product
+            current_order_type = order_type or self._default_order_type
+            # Trade-log fields shared by every outcome of this order; each call adds price/status/remarks
+            log_fields = {'strategy_name': self.name, 'symbol': symbol, 'exchange': current_exchange,
+                          'action': action, 'quantity': quantity, 'order_type': current_order_type}
             
             # Price for LIMIT orders, from signal or None for MARKET
             limit_price = signal.get('price') 
 
-            order_params = {
-                "variety": "regular", # Could be 'amo'. BO/CO varieties are more complex.
-                "exchange": current_exchange.upper(),
-                "tradingsymbol": symbol,
-                "transaction_type": action.upper(),
-                "quantity": quantity,
-                "product": current_product.upper(),
-                "order_type": current_order_type.upper(),
-            }
+            order_params = self._order_template.copy()
+            order_params["tradingsymbol"] = symbol
+            order_params["transaction_type"] = action.upper()
+            order_params["quantity"] = quantity
+            # Only per-call overrides need re-normalising; the template holds the defaults
+            if exchange: order_params["exchange"] = exchange.upper()
+            if product: order_params["product"] = product.upper()
+            if order_type: order_params["order_type"] = order_type.upper()
 
             if order_params["order_type"] == "LIMIT":
                 if not limit_price:
                     msg = f"{self.name}: Limit price not provided for LIMIT order. Symbol: {symbol}"
-                    print(msg)
-                    if self.logger: self.logger.log_trade(self.name, symbol, current_exchange, action, quantity, 0, current_order_type, status="REJECTED", remarks=msg)
+                    log.warning(msg)
+                    if self.logger: self.logger.log_trade(**log_fields, price=0, status="REJECTED", remarks=msg)
                     return None
                 order_params["price"] = limit_price
             
@@ -139,8 +318,8 @@ class SmaCrossoverStrategy(BaseStrategy):
                 # For a SELL SL order (to exit a long), trigger_price is the stop loss sell price.
                 if not stop_loss_price: # stop_loss_price here means the trigger price for SL/SL-M
                     msg = f"{self.name}: Trigger price (stop_loss_price) not provided for {current_order_type} order. Symbol: {symbol}"
-                    print(msg)
-                    if self.logger: self.logger.log_trade(self.name, symbol, current_exchange, action, quantity, 0, current_order_type, status="REJECTED", remarks=msg)
+                    log.warning(msg)
+                    if self.logger: self.logger.log_trade(**log_fields, price=0, status="REJECTED", remarks=msg)
                     return None
                 order_params["trigger_price"] = stop_loss_price
                 # SL-M orders usually don't need a limit price, SL orders do.
@@ -159,7 +338,7 @@ class SmaCrossoverStrategy(BaseStrategy):
             if order_params.get("trigger_price"): log_remarks += f" TriggerPx: {order_params['trigger_price']}."
             if target_price: log_remarks += f" Target (for monitoring): {target_price}." # Logged for info, not placed as part of this order
 
-            print(f"{self.name}: {log_remarks} For {quantity} {symbol}.")
+            log.info("%s: %s For %s %s.", self.name, log_remarks, quantity, symbol)
 
             try:
                 order_id = self.broker_api.place_order(**order_params)
@@ -170,27 +349,43 @@ class SmaCrossoverStrategy(BaseStrategy):
                         final_remarks += f" SL (for monitoring): {stop_loss_price}."
 
 
-                    print(f"{self.name}: Live order placement successful. {final_remarks}")
+                    log.info("%s: Live order placement successful. %s", self.name, final_remarks)
                     if self.logger:
                         self.logger.log_trade(
-                            strategy_name=self.name, symbol=symbol, exchange=current_exchange,
-                            action=action, quantity=quantity, 
+                            **log_fields,
                             price=limit_price or order_params.get("trigger_price", 0), # Log limit or trigger if available
-                            order_type=current_order_type, order_id=order_id, status="PLACED_LIVE",
-                            remarks=final_remarks
+                            order_id=order_id, status="PLACED_LIVE", remarks=final_remarks
                         )
                     return order_id
                 else:
                     msg = f"{self.name}: Live order placement failed. No Order ID received. Symbol: {symbol}"
-                    print(msg)
-                    if self.logger: self.logger.log_trade(self.name, symbol, current_exchange, action, quantity, limit_price or 0, current_order_type, status="FAILURE_LIVE", remarks="No Order ID")
+                    log.warning(msg)
+                    if self.logger: self.logger.log_trade(**log_fields, price=limit_price or 0, status="FAILURE_LIVE", remarks="No Order ID")
                     return None
             except Exception as e:
                 msg = f"{self.name}: Exception during live order placement for {symbol}: {e}"
-                print(msg)
-                if self.logger: self.logger.log_trade(self.name, symbol, current_exchange, action, quantity, limit_price or 0, current_order_type, status="EXCEPTION_LIVE", remarks=str(e))
+                log.warning(msg)
+                if self.logger: self.logger.log_trade(**log_fields, price=limit_price or 0, status="EXCEPTION_LIVE", remarks=str(e))
                 return None
 
+    def execute_trades_batch(self, signals, symbols, quantities, exchange=None, product=None, order_type=None,
+                             max_workers=8):
+        """
+        Places one live order per (signal, symbol, quantity), e.g. when a crossover fires
+        across a whole basket at once. There is no batched broker call: each order is a
+        separate execute_trade submitted to a thread pool, so the broker round trips
+        overlap instead of running back to back. Invalid signals are rejected and logged
+        by execute_trade as usual.
+
+        Returns:
+            list: Order ID (or None if it failed) per input order, in input order.
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(symbols)))) as ex:
+            return list(ex.map(
+                lambda signal, symbol, qty: self.execute_trade(signal, symbol, int(qty), exchange=exchange,
+                                                               product=product, order_type=order_type),
+                signals, symbols, quantities))
+
 # Example of how parameters might be defined in config.py and passed
 # EXAMPLE_STRATEGY_PARAMS = {
 #     "short_window": 10,
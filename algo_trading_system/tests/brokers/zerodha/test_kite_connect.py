@@ -1,8 +1,9 @@
 # algo_trading_system/tests/brokers/zerodha/test_kite_connect.py
-import unittest
+import pytest
 from unittest.mock import patch, MagicMock, mock_open, call
 import json
 import os
+from types import MappingProxyType
 
 # Ensure the main project directory is in PYTHONPATH if running tests from 'tests' directory
 # This might be needed depending on test runner configuration.
@@ -17,203 +18,260 @@ from brokers.zerodha.kite_connect import KiteConnectAPI, TokenException, InputEx
 MOCK_CONFIG_ZERODHA_API_KEY = "test_api_key"
 MOCK_CONFIG_ZERODHA_API_SECRET = "test_api_secret"
 MOCK_CONFIG_ZERODHA_REQUEST_TOKEN = "test_request_token" # For when no file token exists
-MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE = "logs/test_access_token.json"
-
-
-# Patch the config variables at the module level where KiteConnectAPI is defined
-@patch('brokers.zerodha.kite_connect.ZERODHA_API_KEY', MOCK_CONFIG_ZERODHA_API_KEY)
-@patch('brokers.zerodha.kite_connect.ZERODHA_API_SECRET', MOCK_CONFIG_ZERODHA_API_SECRET)
-@patch('brokers.zerodha.kite_connect.ZERODHA_REQUEST_TOKEN', MOCK_CONFIG_ZERODHA_REQUEST_TOKEN)
-@patch('brokers.zerodha.kite_connect.ZERODHA_ACCESS_TOKEN_FILE', MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
-@patch('brokers.zerodha.kite_connect.os.makedirs') # Mock makedirs
-class TestKiteConnectAPIWithActualLogic(unittest.TestCase):
-
-    def setUp(self):
-        # Clean up any potential token file from previous test runs
-        # Ensure the directory for the mock token file exists for cleanup
-        logs_dir = os.path.dirname(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
-        if not os.path.exists(logs_dir):
-            os.makedirs(logs_dir) # Create 'logs' if it doesn't exist for test setup/teardown
-            
-        if os.path.exists(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE):
-            os.remove(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
-        
-        # Mock logger can be simple or more complex if log outputs need to be asserted
-        self.mock_logger = MagicMock()
-
-    def tearDown(self):
-        # Clean up token file created during tests
-        if os.path.exists(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE):
-            os.remove(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
-        # Clean up the 'logs' directory if it was created by setUp for tests and is empty
-        logs_dir = os.path.dirname(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
-        if os.path.exists(logs_dir) and not os.listdir(logs_dir):
-            os.rmdir(logs_dir)
-
-
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_01_initialization(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        api = KiteConnectAPI(api_key="custom_key", logger=self.mock_logger)
+
+# Broker responses shared by the logged-in tests; treat as read-only
+MOCK_LOGIN_PROFILE = {"user_id": "fakeUser", "user_name": "Fake User"}
+MOCK_PROFILE = {"user_name": "Test User", "email": "test@example.com"}
+MOCK_POSITIONS = {"day": [], "net": [{"tradingsymbol": "INFY"}]}
+# Token assigned directly for tests that only need a logged-in API;
+# the login flow itself is covered by tests 04-06b
+MOCK_LOGGED_IN_TOKEN = "fake_access_token"
+
+# Session and stored-token payloads for the login tests (read-only; see the fixtures below)
+SESSION_SUCCESS = MappingProxyType({"access_token": "new_access_token", "public_token": "new_public_token", "user_id": "testuser123"})
+STORED_TOKEN_DATA = MappingProxyType({"access_token": "stored_access_token", "public_token": "stored_public_token", "user_id": "storedUser"})
+EXPIRED_TOKEN_DATA = MappingProxyType({"access_token": "expired_token", "user_id": "expiredUser"})
+STALE_TOKEN_DATA = MappingProxyType({"access_token": "old_token", "user_id": "oldUser", "saved_at": 1700000000.0})
+
+# Stored token files read by the login tests, serialised once
+_STORED_TOKEN_JSON = json.dumps(dict(STORED_TOKEN_DATA))
+_EXPIRED_TOKEN_JSON = json.dumps(dict(EXPIRED_TOKEN_DATA))
+_STALE_TOKEN_JSON = json.dumps(dict(STALE_TOKEN_DATA))
+
+
+KITE_MODULE = 'brokers.zerodha.kite_connect'
+
+
+@pytest.fixture
+def token_file(tmp_path):
+    """Access-token path for this test, in a fresh tmp dir (so it never exists up front)."""
+    return str(tmp_path / "test_access_token.json")
+
+
+@pytest.fixture
+def write_token_file(token_file):
+    """Returns a function that stores a token JSON payload at this test's token_file for login() to read."""
+    def write(payload):
+        with open(token_file, 'w') as f:
+            f.write(payload)
+    return write
+
+
+@pytest.fixture
+def session_success():
+    """generate_session() response for a successful login; a copy, so tests may mutate it."""
+    return dict(SESSION_SUCCESS)
+
+
+@pytest.fixture
+def mock_makedirs(monkeypatch):
+    makedirs = MagicMock()
+    monkeypatch.setattr(f'{KITE_MODULE}.os.makedirs', makedirs)
+    return makedirs
+
+
+@pytest.fixture(autouse=True)
+def kite_env(token_file, mock_makedirs, monkeypatch):
+    """Patches the config values kite_connect imported and its KiteApp client; yields the KiteApp class mock."""
+    # Patch the config variables at the module level where KiteConnectAPI is defined
+    monkeypatch.setattr(f'{KITE_MODULE}.ZERODHA_API_KEY', MOCK_CONFIG_ZERODHA_API_KEY)
+    monkeypatch.setattr(f'{KITE_MODULE}.ZERODHA_API_SECRET', MOCK_CONFIG_ZERODHA_API_SECRET)
+    monkeypatch.setattr(f'{KITE_MODULE}.ZERODHA_REQUEST_TOKEN', MOCK_CONFIG_ZERODHA_REQUEST_TOKEN)
+    monkeypatch.setattr(f'{KITE_MODULE}.ZERODHA_ACCESS_TOKEN_FILE', token_file)
+    kite_app_class = MagicMock()
+    monkeypatch.setattr(f'{KITE_MODULE}.KiteApp', kite_app_class)
+    yield kite_app_class
+
+
+@pytest.fixture
+def invalid_then_valid_profile(kite_env, write_token_file, monkeypatch):
+    """
+    An expired token is stored, and kite.profile() rejects it on the first call but
+    succeeds afterwards. Returns the list of profile() calls made.
+    """
+    write_token_file(_EXPIRED_TOKEN_JSON)
+    calls = []
+
+    def profile():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise TokenException("Token expired")
+        return {"user_id": "newUser", "user_name": "New User"}
+
+    monkeypatch.setattr(kite_env.return_value, "profile", profile)
+    return calls
+
+
+class RecordingLogger:
+    """Stand-in for TradeLogger that records each log_trade call's keyword arguments in a set."""
+
+    def __init__(self):
+        self.calls = set()
+
+    def log_trade(self, **kwargs):
+        self.calls.add(frozenset(kwargs.items()))
+
+    def assert_logged(self, **kwargs):
+        # Set membership instead of scanning a mock's call list
+        assert frozenset(kwargs.items()) in self.calls, f"log_trade({kwargs}) not among {len(self.calls)} logged calls"
+
+
+@pytest.fixture
+def mock_logger():
+    return RecordingLogger()
+
+
+@pytest.fixture(scope="class")
+def logged_in_api():
+    """One logged-in KiteConnectAPI per test class; use it through the `api` fixture."""
+    with patch(f'{KITE_MODULE}.KiteApp'), patch(f'{KITE_MODULE}.os.makedirs'):
+        api = KiteConnectAPI(logger=RecordingLogger())
+    api.access_token = MOCK_LOGGED_IN_TOKEN
+    return api
+
+
+@pytest.fixture
+def api(logged_in_api):
+    """The shared logged-in API with its kite client mock and recorded log calls reset for this test."""
+    logged_in_api.kite.reset_mock(return_value=True, side_effect=True)
+    logged_in_api.logger.calls.clear()
+    # Ensure kite instance within api object is correctly set up for profile calls
+    # This is crucial if get_profile is called internally by other methods being tested.
+    logged_in_api.kite.profile.return_value = MOCK_LOGIN_PROFILE
+    return logged_in_api
+
+
+class TestKiteConnectAPIWithActualLogic:
+
+    def test_01_initialization(self, kite_env, mock_makedirs, mock_logger, token_file):
+        mock_kite_instance = kite_env.return_value
+        api = KiteConnectAPI(api_key="custom_key", logger=mock_logger)
         
-        MockKiteAppClass.assert_called_once_with(api_key="custom_key")
-        self.assertEqual(api.kite, mock_kite_instance)
-        self.assertEqual(api.api_key, "custom_key")
-        self.assertEqual(api.access_token_file, MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE)
+        kite_env.assert_called_once_with(api_key="custom_key")
+        assert api.kite == mock_kite_instance
+        assert api.api_key == "custom_key"
+        assert api.access_token_file == token_file
         # makedirs is called by the module-level code in kite_connect.py for ZERODHA_ACCESS_TOKEN_FILE path,
         # and potentially again if a different path was used in constructor (not the case here).
-        # The mock_makedirs_call here refers to the one patched for the class context.
+        # mock_makedirs is the os.makedirs patched by the fixture for this test.
         # The actual call to os.makedirs in __init__ uses the self.access_token_file path.
-        mock_makedirs_call.assert_any_call(os.path.dirname(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE), exist_ok=True)
-        self.mock_logger.log_trade.assert_called() # Check if logger was called
+        mock_makedirs.assert_any_call(os.path.dirname(token_file), exist_ok=True)
+        assert mock_logger.calls # Check if logger was called
 
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_02_get_login_url(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
+    def test_02_get_login_url(self, kite_env, mock_logger):
+        mock_kite_instance = kite_env.return_value
         mock_kite_instance.login_url.return_value = "http://test.login.url"
         
-        api = KiteConnectAPI(logger=self.mock_logger)
+        api = KiteConnectAPI(logger=mock_logger)
         login_url = api.get_login_url()
         
-        self.assertEqual(login_url, "http://test.login.url")
+        assert login_url == "http://test.login.url"
         mock_kite_instance.login_url.assert_called_once()
 
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_03_generate_session_success(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        mock_session_data = {
-            "access_token": "new_access_token",
-            "public_token": "new_public_token",
-            "user_id": "testuser123"
-        }
-        mock_kite_instance.generate_session.return_value = mock_session_data
+    def test_03_generate_session_success(self, kite_env, mock_logger, token_file, session_success):
+        mock_kite_instance = kite_env.return_value
+        mock_kite_instance.generate_session.return_value = session_success
         
-        api = KiteConnectAPI(logger=self.mock_logger)
+        api = KiteConnectAPI(logger=mock_logger)
         
-        with patch('builtins.open', mock_open()) as mocked_file_open:
+        with patch('builtins.open', mock_open()) as mocked_file_open, \
+             patch('brokers.zerodha.kite_connect.os.replace') as mock_replace, \
+             patch('brokers.zerodha.kite_connect.time.time', return_value=1700000000.0):
             access_token = api.generate_session("test_req_token", "test_secret")
         
-        self.assertEqual(access_token, "new_access_token")
-        self.assertEqual(api.access_token, "new_access_token")
-        self.assertEqual(api.user_id, "testuser123")
+        assert access_token == "new_access_token"
+        assert api.access_token == "new_access_token"
+        assert api.user_id == "testuser123"
         mock_kite_instance.generate_session.assert_called_once_with("test_req_token", api_secret="test_secret")
         mock_kite_instance.set_access_token.assert_called_once_with("new_access_token")
         
-        mocked_file_open.assert_called_once_with(MOCK_CONFIG_ZERODHA_ACCESS_TOKEN_FILE, 'w')
-        handle = mocked_file_open()
-        handle.write.assert_called_once_with(json.dumps(mock_session_data))
-        self.mock_logger.log_trade.assert_any_call(action='GEN_SESSION', status='SUCCESS', remarks='Session generated for user testuser123.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
+        # Token is written to a temp file, stamped with the save time, then renamed into place
+        tmp_file = token_file + '.tmp'
+        mocked_file_open.assert_called_once_with(tmp_file, 'w')
+        written = "".join(c.args[0] for c in mocked_file_open().write.call_args_list)
+        assert json.loads(written) == {**SESSION_SUCCESS, "saved_at": 1700000000.0}
+        mock_replace.assert_called_once_with(tmp_file, token_file)
+        mock_logger.assert_logged(action='GEN_SESSION', status='SUCCESS', remarks='Session generated for user testuser123.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
 
 
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_04_login_no_stored_token_uses_request_token_from_config(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        with patch('brokers.zerodha.kite_connect.os.path.exists', return_value=False):
-            mock_session_data = {"access_token": "generated_token", "user_id": "userXYZ"}
-            mock_kite_instance.generate_session.return_value = mock_session_data
-            mock_kite_instance.profile.return_value = {"user_id": "userXYZ", "user_name": "Test User"}
+    def test_04_login_no_stored_token_uses_request_token_from_config(self, kite_env, mock_logger, token_file):
+        mock_kite_instance = kite_env.return_value
+        mock_kite_instance.generate_session.return_value = {"access_token": "generated_token", "user_id": "userXYZ"}
 
-            api = KiteConnectAPI(logger=self.mock_logger)
-            with patch('builtins.open', mock_open()):
-                 access_token = api.login()
+        api = KiteConnectAPI(logger=mock_logger)
+        access_token = api.login() # No file at token_file yet
 
-        self.assertEqual(access_token, "generated_token")
+        assert access_token == "generated_token"
         mock_kite_instance.generate_session.assert_called_once_with(MOCK_CONFIG_ZERODHA_REQUEST_TOKEN, api_secret=MOCK_CONFIG_ZERODHA_API_SECRET)
-        self.mock_logger.log_trade.assert_any_call(action='LOGIN', status='SUCCESS', remarks='Logged in as userXYZ using stored token.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
+        mock_kite_instance.profile.assert_not_called() # Nothing stored to validate
+        with open(token_file) as f:
+            assert json.load(f)["access_token"] == "generated_token"
+        mock_logger.assert_logged(action='SAVE_TOKEN', status='SUCCESS', remarks=f'Token saved to {token_file}', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
+        mock_logger.assert_logged(action='GEN_SESSION', status='SUCCESS', remarks='Session generated for user userXYZ.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
 
 
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_05_login_with_stored_valid_token(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        stored_token_data = {
-            "access_token": "stored_access_token",
-            "public_token": "stored_public_token",
-            "user_id": "storedUser"
-        }
-        with patch('brokers.zerodha.kite_connect.os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data=json.dumps(stored_token_data))):
-            
-            mock_kite_instance.profile.return_value = {"user_id": "storedUser", "user_name": "Stored Test User"}
-            
-            api = KiteConnectAPI(logger=self.mock_logger)
-            access_token = api.login()
-
-        self.assertEqual(access_token, "stored_access_token")
-        self.assertEqual(api.user_id, "storedUser")
-        mock_kite_instance.set_access_token.assert_called_with("stored_access_token")
+    def test_05_login_with_stored_valid_token(self, kite_env, mock_logger, write_token_file):
+        mock_kite_instance = kite_env.return_value
+        write_token_file(_STORED_TOKEN_JSON)
+        mock_kite_instance.profile.return_value = {"user_id": "storedUser", "user_name": "Stored Test User"}
+
+        api = KiteConnectAPI(logger=mock_logger)
+        access_token = api.login()
+
+        assert access_token == STORED_TOKEN_DATA["access_token"]
+        assert api.user_id == STORED_TOKEN_DATA["user_id"]
+        mock_kite_instance.set_access_token.assert_called_with(STORED_TOKEN_DATA["access_token"])
         mock_kite_instance.profile.assert_called_once() 
         mock_kite_instance.generate_session.assert_not_called() 
-        self.mock_logger.log_trade.assert_any_call(action='LOGIN', status='SUCCESS', remarks='Logged in as storedUser using stored token.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
-
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_06_login_with_stored_invalid_token_then_new_login(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        stored_token_data = {"access_token": "expired_token", "user_id": "expiredUser"}
-
-        with patch('brokers.zerodha.kite_connect.os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data=json.dumps(stored_token_data))) as mock_file:
-            
-            mock_kite_instance.profile.side_effect = [
-                TokenException("Token expired"), 
-                {"user_id": "newUser", "user_name": "New User"}
-            ]
-            
-            new_session_data = {"access_token": "new_valid_token", "user_id": "newUser"}
-            mock_kite_instance.generate_session.return_value = new_session_data
-            
-            api = KiteConnectAPI(logger=self.mock_logger)
-            # Use request_token_override for this specific test scenario
-            access_token = api.login(request_token_override="new_req_token_for_test") 
-
-        self.assertEqual(access_token, "new_valid_token")
+        mock_logger.assert_logged(action='LOGIN', status='SUCCESS', remarks='Logged in as storedUser using stored token.', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
+
+    def test_06_login_with_stored_invalid_token_then_new_login(self, kite_env, mock_logger, invalid_then_valid_profile):
+        mock_kite_instance = kite_env.return_value
+        mock_kite_instance.generate_session.return_value = {"access_token": "new_valid_token", "user_id": "newUser"}
+
+        api = KiteConnectAPI(logger=mock_logger)
+        # Use request_token_override for this specific test scenario
+        access_token = api.login(request_token_override="new_req_token_for_test") 
+
+        assert access_token == "new_valid_token"
+        assert invalid_then_valid_profile # Stored token was validated (and rejected) before the new session
         # generate_session called with the override token
         mock_kite_instance.generate_session.assert_called_once_with("new_req_token_for_test", api_secret=MOCK_CONFIG_ZERODHA_API_SECRET)
-        self.assertEqual(mock_kite_instance.set_access_token.call_count, 2) 
-        mock_kite_instance.set_access_token.assert_any_call("expired_token")
+        assert mock_kite_instance.set_access_token.call_count == 2
+        mock_kite_instance.set_access_token.assert_any_call(EXPIRED_TOKEN_DATA["access_token"])
         mock_kite_instance.set_access_token.assert_any_call("new_valid_token")
 
-    def _setup_api_with_valid_login(self, mock_kite_instance):
-        api = KiteConnectAPI(logger=self.mock_logger)
-        api.access_token = "fake_access_token" 
-        api.kite = mock_kite_instance 
-        # Ensure kite instance within api object is correctly set up for profile calls
-        # This is crucial if get_profile is called internally by other methods being tested.
-        mock_kite_instance.profile.return_value = {"user_id": "fakeUser", "user_name": "Fake User"}
-        return api
-
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_07_get_profile_success(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        api = self._setup_api_with_valid_login(mock_kite_instance) # api.kite is now mock_kite_instance
-        
-        expected_profile = {"user_name": "Test User", "email": "test@example.com"}
+    def test_06b_login_skips_stale_stored_token(self, kite_env, mock_logger, write_token_file):
+        mock_kite_instance = kite_env.return_value
+        write_token_file(_STALE_TOKEN_JSON)
+        with patch('brokers.zerodha.kite_connect.time.time', return_value=1700000000.0 + 9 * 3600):
+            mock_kite_instance.generate_session.return_value = {"access_token": "fresh_token", "user_id": "oldUser"}
+
+            api = KiteConnectAPI(logger=mock_logger)
+            access_token = api.login(request_token_override="fresh_req_token")
+
+        assert access_token == "fresh_token"
+        mock_kite_instance.profile.assert_not_called() # No validation round-trip for a stale token
+        mock_kite_instance.set_access_token.assert_called_once_with("fresh_token")
+
+    def test_07_get_profile_success(self, api):
         # Configure the return value of profile on the instance of KiteApp used by api
-        api.kite.profile.return_value = expected_profile 
+        api.kite.profile.return_value = MOCK_PROFILE
         
         profile = api.get_profile()
         
-        self.assertEqual(profile, expected_profile)
+        assert profile == MOCK_PROFILE
         api.kite.profile.assert_called_once()
 
-
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_08_get_positions_success(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        api = self._setup_api_with_valid_login(mock_kite_instance)
-        
-        expected_positions = {"day": [], "net": [{"tradingsymbol": "INFY"}]}
-        api.kite.positions.return_value = expected_positions # Configure on the instance
+    def test_08_get_positions_success(self, api):
+        api.kite.positions.return_value = MOCK_POSITIONS # Configure on the instance
         
         positions = api.get_positions()
         
-        self.assertEqual(positions, expected_positions)
+        assert positions == MOCK_POSITIONS
         api.kite.positions.assert_called_once()
 
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_09_place_order_success(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        api = self._setup_api_with_valid_login(mock_kite_instance)
-        
+    def test_09_place_order_success(self, api):
         api.kite.place_order.return_value = "test_order_id_123" # Configure on the instance
         
         order_params = {
@@ -223,30 +281,23 @@ class TestKiteConnectAPIWithActualLogic(unittest.TestCase):
         }
         order_id = api.place_order(**order_params, tag="testtag")
         
-        self.assertEqual(order_id, "test_order_id_123")
-        api.kite.place_order.assert_called_once_with(
-            variety='regular', exchange='NSE', tradingsymbol='INFY', 
-            transaction_type='BUY', quantity=1, product='CNC', 
-            order_type='LIMIT', price=100.0, trigger_price=None, 
-            squareoff=None, stoploss=None, trailing_stoploss=None, 
-            disclosed_quantity=None, tag='testtag'
-        )
+        assert order_id == "test_order_id_123"
+        # Unset optional order fields are passed through to Kite as None
+        expected = {**order_params, "trigger_price": None, "squareoff": None, "stoploss": None,
+                    "trailing_stoploss": None, "disclosed_quantity": None, "tag": "testtag"}
+        api.kite.place_order.assert_called_once()
+        assert api.kite.place_order.call_args.kwargs == expected
         
-    @patch('brokers.zerodha.kite_connect.KiteApp')
-    def test_10_api_method_exception_handling(self, MockKiteAppClass, mock_makedirs_call):
-        mock_kite_instance = MockKiteAppClass.return_value
-        api = self._setup_api_with_valid_login(mock_kite_instance)
-
-        api.kite.profile.side_effect = TokenException("API token error")
-        profile = api.get_profile()
-        self.assertIsNone(profile)
-        self.mock_logger.log_trade.assert_any_call(action='GET_PROFILE', status='TOKEN_ERROR', remarks='API token error', strategy_name='SYSTEM_KITE_API', symbol='-', exchange='-', quantity=0, price=0, order_type='-')
-
-        api.kite.place_order.side_effect = InputException("Invalid input")
-        order_id = api.place_order(variety="regular", exchange="NSE", tradingsymbol="SBIN", 
-                                   transaction_type="BUY", quantity=1, product="MIS", order_type="MARKET")
-        self.assertIsNone(order_id)
-        self.mock_logger.log_trade.assert_any_call(action='PLACE_ORDER', status='INPUT_ERROR', remarks='Invalid input', strategy_name='SYSTEM_KITE_API', symbol='SBIN', exchange='NSE', quantity=0, price=0, order_type='-')
-
-if __name__ == '__main__':
-    unittest.main()
+    @pytest.mark.parametrize("method, kite_method, exc, expected_status, call_kwargs, log_fields", [
+        ("get_profile", "profile", TokenException("API token error"), "TOKEN_ERROR", {},
+         dict(action='GET_PROFILE', symbol='-', exchange='-')),
+        ("place_order", "place_order", InputException("Invalid input"), "INPUT_ERROR",
+         dict(variety="regular", exchange="NSE", tradingsymbol="SBIN", transaction_type="BUY",
+              quantity=1, product="MIS", order_type="MARKET"),
+         dict(action='PLACE_ORDER', symbol='SBIN', exchange='-')), # _log_api_action is only given the symbol
+    ], ids=["get_profile_token_error", "place_order_input_error"])
+    def test_10_api_method_exception_handling(self, api, method, kite_method, exc, expected_status, call_kwargs, log_fields):
+        getattr(api.kite, kite_method).side_effect = exc
+        assert getattr(api, method)(**call_kwargs) is None
+        api.logger.assert_logged(status=expected_status, remarks=str(exc), strategy_name='SYSTEM_KITE_API',
+                                 quantity=0, price=0, order_type='-', **log_fields)
@@ -0,0 +1,93 @@
+# algo_trading_system/tests/conftest.py
+# Shared pytest fixtures. On-disk log files live under pytest's tmp_path directories, which
+# are unique per test run (and per xdist worker) and cleaned up by pytest itself; tests that
+# write entries use in-memory files instead.
+import csv
+import io
+from collections import deque
+from datetime import datetime
+import pytest
+import data_management.trade_logger
+from data_management.trade_logger import TradeLogger
+from core.jit import NUMBA_AVAILABLE
+
+
+def pytest_report_header(config):
+    return f"numba kernels: {'compiled' if NUMBA_AVAILABLE else 'plain Python fallback (numba not installed)'}"
+
+
+class _MemoryFile(io.StringIO):
+    def close(self):
+        pass # Keep the contents readable after the logger closes its handle
+
+
+class MemoryFiles:
+    """open()-compatible factory over in-memory text buffers, keyed by path."""
+
+    def __init__(self):
+        self.buffers = {}
+
+    def open(self, path, mode='r', newline=None):
+        buf = self.buffers.setdefault(path, _MemoryFile())
+        if 'w' in mode:
+            buf.seek(0)
+            buf.truncate()
+        elif 'a' in mode:
+            buf.seek(0, io.SEEK_END)
+        else:
+            buf.seek(0)
+        return buf
+
+    def rows(self, path):
+        return list(csv.reader(self.buffers[path].getvalue().splitlines()))
+
+    def last_row(self, path):
+        buf = self.buffers[path]
+        buf.seek(0)
+        return next(csv.reader(deque(buf, maxlen=1))) # Keeps only the final line while scanning
+
+
+FROZEN_NOW = datetime(2024, 1, 1, 10, 0, 0)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return FROZEN_NOW if tz is None else FROZEN_NOW.astimezone(tz)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def frozen_trade_logger_clock():
+    """Pins TradeLogger's datetime.now() for the whole run: constant, deterministic timestamps."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(data_management.trade_logger, "datetime", _FrozenDatetime)
+        yield
+
+
+@pytest.fixture
+def memory_files():
+    return MemoryFiles()
+
+
+@pytest.fixture(scope="module")
+def logger_files(tmp_path_factory):
+    d = tmp_path_factory.mktemp("tl")
+    return d / "trades.csv", d / "daily.csv"
+
+
+@pytest.fixture(scope="module")
+def shared_logger(logger_files):
+    """One TradeLogger per test module, for tests that only read the freshly initialised files."""
+    logger = TradeLogger(*map(str, logger_files))
+    yield logger
+    logger.close()
+
+
+@pytest.fixture
+def fresh_logger(tmp_path, memory_files):
+    """A TradeLogger writing to in-memory files of its own (read them back via memory_files.rows)."""
+    logger = TradeLogger(trade_log_file=str(tmp_path / "trades.csv"),
+                         daily_summary_file=str(tmp_path / "daily.csv"),
+                         opener=memory_files.open)
+    yield logger
+    logger.close()
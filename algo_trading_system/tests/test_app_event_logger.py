@@ -0,0 +1,34 @@
+# algo_trading_system/tests/test_app_event_logger.py
+import csv
+import pytest
+# This assumes running tests from the root directory of the project.
+from data_management.app_event_logger import AppEventLogger
+
+
+@pytest.fixture
+def event_log_file(tmp_path):
+    return str(tmp_path / "app_events.csv") # Per-test file, so xdist workers never share one
+
+
+def read_rows(path):
+    with open(path, 'r') as f:
+        return list(csv.reader(f))
+
+
+def test_01_log_event(event_log_file):
+    assert AppEventLogger(event_log_file=event_log_file).log_event(
+        "APP_START_LIVE", "SUCCESS", "Application started in live trading mode.")
+
+    lines = read_rows(event_log_file)
+    assert lines[0] == ['Timestamp', 'Action', 'Status', 'Remarks']
+    assert len(lines) == 2 # Header + 1 event
+    assert lines[1][1:] == ["APP_START_LIVE", "SUCCESS", "Application started in live trading mode."]
+
+
+def test_02_existing_log_is_appended(event_log_file):
+    AppEventLogger(event_log_file=event_log_file).log_event("APP_END_LIVE", "SUCCESS")
+    AppEventLogger(event_log_file=event_log_file).log_event("APP_START_BACKTEST", "INFO")
+
+    lines = read_rows(event_log_file)
+    assert len(lines) == 3 # Header written once
+    assert [row[1] for row in lines[1:]] == ["APP_END_LIVE", "APP_START_BACKTEST"]
@@ -0,0 +1,45 @@
+# algo_trading_system/tests/test_base_strategy.py
+import unittest
+from strategies.base_strategy import BaseStrategy
+from strategies.signals import Signal
+
+
+class FixedSignalStrategy(BaseStrategy):
+    """Returns the same signal on every call and records execute_trade calls."""
+    __slots__ = ('signal', 'trades')
+
+    def __init__(self, signal):
+        super().__init__(name="Fixed", broker_api=None, logger=None)
+        self.signal = signal
+        self.trades = []
+
+    def generate_signals(self, historical_data):
+        return self.signal
+
+    def execute_trade(self, **kwargs):
+        self.trades.append(kwargs)
+        return "ORDER1"
+
+
+class TestRunLive(unittest.TestCase):
+    def test_01_bare_signal_is_expanded_and_traded(self):
+        for direction in (Signal.BUY, Signal.SELL, -1):
+            strategy = FixedSignalStrategy(direction)
+            strategy.run_live("INFY", 5)
+            self.assertEqual(len(strategy.trades), 1)
+            kwargs = strategy.trades[0]
+            self.assertEqual(kwargs['signal']['action'], Signal(direction).name)
+            self.assertEqual((kwargs['symbol'], kwargs['quantity']), ("INFY", 5))
+
+    def test_02_hold_and_dict_signals(self):
+        strategy = FixedSignalStrategy(Signal.HOLD)
+        strategy.run_live("INFY", 5)
+        self.assertEqual(strategy.trades, [])
+
+        strategy = FixedSignalStrategy({'action': 'BUY', 'price': 10.0, 'sl_price': 9.5})
+        strategy.run_live("INFY", 5)
+        self.assertEqual(strategy.trades[0]['stop_loss_price'], 9.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
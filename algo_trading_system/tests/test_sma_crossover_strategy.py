@@ -0,0 +1,172 @@
+# algo_trading_system/tests/test_sma_crossover_strategy.py
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+import pandas as pd
+# This assumes running tests from the root directory of the project.
+from strategies.sma_crossover_strategy import SmaCrossoverStrategy, _sma_crossover_kernel, _specialized_kernel
+from core.backtest_engine import BacktestEngine
+
+
+def make_price_data(n_bars=300, seed=7):
+    """Random-walk OHLCV data with enough swings to produce several SMA crossovers."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n_bars))
+    index = pd.date_range("2023-01-02 09:15:00", periods=n_bars, freq="D", name="timestamp")
+    return pd.DataFrame({
+        'open': close, 'high': close + 1, 'low': close - 1, 'close': close,
+        'volume': np.full(n_bars, 1000),
+    }, index=index)
+
+
+class PerBarSmaCrossoverStrategy(SmaCrossoverStrategy):
+    """Forces the BacktestEngine onto the per-bar generate_signals path."""
+    def generate_signals_batch(self, historical_data):
+        return None
+
+
+class TestSmaCrossoverStrategy(unittest.TestCase):
+    def setUp(self):
+        self.params = {'short_window': 5, 'long_window': 20, 'stop_loss_percent': 2, 'target_percent': 4}
+        self.data = make_price_data()
+
+    def _make_strategy(self):
+        return SmaCrossoverStrategy(name="TestSma", broker_api=None, logger=None, params=self.params)
+
+    def _per_bar_signals(self, strategy=None):
+        strategy = strategy or self._make_strategy()
+        directions = []
+        for i in range(len(self.data)):
+            signal = strategy.generate_signals(self.data.iloc[:i + 1])
+            directions.append({'BUY': 1, 'SELL': -1}[signal['action']] if signal else 0)
+        return np.array(directions, dtype=np.int8)
+
+    def test_01_batch_signals_match_per_bar_signals(self):
+        batch = self._make_strategy().generate_signals_batch(self.data)
+        self.assertEqual(batch.dtype, np.int8)
+        self.assertTrue(np.any(batch == 1) and np.any(batch == -1)) # Data must exercise both crossovers
+        np.testing.assert_array_equal(batch, self._per_bar_signals())
+
+    def test_01b_kernel_matches_per_bar_signals(self):
+        # Runs as plain Python when numba is not installed
+        kernel = _sma_crossover_kernel(self.data['close'].to_numpy(), self.params['short_window'], self.params['long_window'])
+        np.testing.assert_array_equal(kernel, self._per_bar_signals())
+
+    def test_01d_specialized_kernel_matches_generic_kernel(self):
+        close = self.data['close'].to_numpy()
+        kernel = _specialized_kernel(self.params['short_window'], self.params['long_window'])
+        self.assertIs(kernel, _specialized_kernel(self.params['short_window'], self.params['long_window']))
+        np.testing.assert_array_equal(kernel(close), _sma_crossover_kernel(close, self.params['short_window'], self.params['long_window']))
+
+    def test_02_build_signal_adds_sl_tp_for_buy(self):
+        signal = self._make_strategy().build_signal(1, 100.0)
+        self.assertEqual(signal['action'], 'BUY')
+        self.assertAlmostEqual(signal['sl_price'], 98.0)
+        self.assertAlmostEqual(signal['tp_price'], 104.0)
+        self.assertEqual(self._make_strategy().build_signal(-1, 100.0)['reason'], 'SMA_CROSS_DOWN')
+
+    def test_03_backtest_batch_and_per_bar_paths_agree(self):
+        def run(strategy):
+            engine = BacktestEngine(self.data.reset_index(), strategy, initial_capital=100000,
+                                    start_date=self.data.index[0], end_date=self.data.index[-1],
+                                    trade_logger=None, symbol="TEST", qty_per_trade=10)
+            return engine.run()
+
+        batch_trades = run(self._make_strategy())
+        per_bar_trades = run(PerBarSmaCrossoverStrategy(name="TestSma", broker_api=None, logger=None, params=self.params))
+
+        self.assertTrue(batch_trades)
+        self.assertEqual(batch_trades, per_bar_trades)
+
+    def test_04_streaming_state_reseeds_on_new_series(self):
+        strategy = self._make_strategy()
+        first_pass = self._per_bar_signals(strategy)
+        # Replaying the series restarts the history, which must not reuse the old running sums
+        np.testing.assert_array_equal(self._per_bar_signals(strategy), first_pass)
+        # Joining mid-series (history not one bar longer than last call) also rebuilds the state
+        self.assertEqual(strategy.generate_signals(self.data.iloc[:150]), self._make_strategy().generate_signals(self.data.iloc[:150]))
+
+    def test_05_instances_have_no_dict(self):
+        strategy = self._make_strategy()
+        self.assertFalse(hasattr(strategy, '__dict__'))
+        with self.assertRaises(AttributeError):
+            strategy.unknown_attribute = 1
+
+    def test_06_leaving_equal_smas_counts_as_crossover(self):
+        # Flat prices keep both SMAs equal; the first move away from equality is a crossover
+        self.data['close'] = 100.0
+        self.data.loc[self.data.index[40], 'close'] = 90.0
+        expected = np.zeros(len(self.data), dtype=np.int8)
+        expected[40] = -1 # Dip pulls the short SMA below the long one
+        expected[45] = 1  # and leaving the short window lifts it back above
+        np.testing.assert_array_equal(self._per_bar_signals()[:60], expected[:60])
+        np.testing.assert_array_equal(self._make_strategy().generate_signals_batch(self.data)[:60], expected[:60])
+
+    def test_07_execute_trade_builds_order_params_from_template(self):
+        broker_api = mock.Mock()
+        broker_api.place_order.return_value = "ORDER1"
+        strategy = SmaCrossoverStrategy(name="TestSma", broker_api=broker_api, logger=None, params=self.params)
+
+        self.assertEqual(strategy.execute_trade({'action': 'buy'}, "INFY", 5), "ORDER1")
+        broker_api.place_order.assert_called_with(variety="regular", exchange="NSE", tradingsymbol="INFY",
+                                                  transaction_type="BUY", quantity=5, product="MIS", order_type="MARKET")
+
+        strategy.execute_trade({'action': 'SELL', 'price': 101.5}, "TCS", 2, exchange="bse", order_type="limit")
+        broker_api.place_order.assert_called_with(variety="regular", exchange="BSE", tradingsymbol="TCS",
+                                                  transaction_type="SELL", quantity=2, product="MIS", order_type="LIMIT",
+                                                  price=101.5)
+        # Per-order fields must not leak back into the shared template
+        self.assertIsNone(strategy._order_template["tradingsymbol"])
+        self.assertNotIn("price", strategy._order_template)
+
+    def test_08_multi_symbol_signals_match_single_symbol_batches(self):
+        strategy = self._make_strategy()
+        frames = [make_price_data(seed=seed) for seed in (1, 2, 3)]
+        signals = strategy.generate_signals_multi(np.vstack([frame['close'].to_numpy() for frame in frames]))
+        self.assertEqual(signals.shape, (3, len(self.data)))
+        for row, frame in zip(signals, frames):
+            np.testing.assert_array_equal(row, strategy.generate_signals_batch(frame))
+
+    def test_09_execute_trades_batch(self):
+        signals = [{'action': 'BUY'}, {'action': 'HOLD'}, {'action': 'SELL', 'price': 99.5}]
+        symbols, quantities = ["INFY", "TCS", "SBIN"], [1, 2, 3]
+
+        # One place_order per valid order, results in input order
+        broker_api = mock.Mock(spec=['place_order'])
+        broker_api.place_order.side_effect = lambda **order: f"ID_{order['tradingsymbol']}"
+        trade_logger = mock.Mock()
+        strategy = SmaCrossoverStrategy(name="TestSma", broker_api=broker_api, logger=trade_logger, params=self.params)
+        self.assertEqual(strategy.execute_trades_batch(signals, symbols, quantities), ["ID_INFY", None, "ID_SBIN"])
+        self.assertEqual(broker_api.place_order.call_count, 2)
+        self.assertEqual(sorted(call.kwargs['tradingsymbol'] for call in broker_api.place_order.call_args_list),
+                         ["INFY", "SBIN"])
+        self.assertEqual(sorted(call.kwargs.get('status') for call in trade_logger.log_trade.call_args_list),
+                         ["PLACED_LIVE", "PLACED_LIVE", "REJECTED"])
+
+
+    def test_10_execute_trades_batch_passes_overrides_to_each_order(self):
+        class StubBroker:
+            def __init__(self):
+                self.orders = []
+                self._lock = threading.Lock()
+
+            def place_order(self, **order):
+                with self._lock:
+                    self.orders.append(order)
+                return f"ID_{order['tradingsymbol']}"
+
+        broker = StubBroker()
+        strategy = SmaCrossoverStrategy(name="TestSma", broker_api=broker, logger=None, params=self.params)
+        symbols = [f"SYM{i}" for i in range(20)]
+        signals = [{'action': 'SELL' if i % 2 else 'BUY'} for i in range(20)]
+
+        order_ids = strategy.execute_trades_batch(signals, symbols, range(1, 21), exchange="bse", product="cnc", max_workers=4)
+        self.assertEqual(order_ids, [f"ID_{symbol}" for symbol in symbols])
+        orders = sorted(broker.orders, key=lambda order: order['quantity'])
+        self.assertEqual([order['tradingsymbol'] for order in orders], symbols)
+        self.assertTrue(all(order['exchange'] == "BSE" and order['product'] == "CNC" for order in orders))
+        self.assertEqual([order['transaction_type'] for order in orders[:2]], ["BUY", "SELL"])
+
+if __name__ == '__main__':
+    unittest.main()
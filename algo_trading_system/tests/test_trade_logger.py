@@ -1,100 +1,85 @@
 # algo_trading_system/tests/test_trade_logger.py
-import unittest
-import os
 import csv
 from datetime import datetime
-# Adjust import path based on how you run tests (e.g., from root or tests folder)
-# This assumes running tests from the root directory of the project.
-from data_management.trade_logger import TradeLogger # If running from root
-# If running directly from tests/ folder, and data_management is sibling to tests' parent:
-# import sys
-# sys.path.append(os.path.join(os.path.dirname(__file__), '..')) # Add project root to sys.path
-# from data_management.trade_logger import TradeLogger
+import pytest
+# This assumes running tests from the root directory of the project (fixtures in conftest.py).
 
 
-class TestTradeLogger(unittest.TestCase):
-    def setUp(self):
-        self.test_trade_log_file = "test_trades_temp.csv"
-        self.test_daily_summary_file = "test_daily_summary_temp.csv"
-        # Ensure no old test files are present
-        if os.path.exists(self.test_trade_log_file):
-            os.remove(self.test_trade_log_file)
-        if os.path.exists(self.test_daily_summary_file):
-            os.remove(self.test_daily_summary_file)
-            
-        self.logger = TradeLogger(trade_log_file=self.test_trade_log_file, 
-                                  daily_summary_file=self.test_daily_summary_file)
+@pytest.mark.parametrize("attr,expected_header", [
+    ("trade_log_file", ['Timestamp', 'Strategy', 'Symbol', 'Exchange',
+                        'Action', 'Quantity', 'Price', 'OrderType',
+                        'StopLoss', 'Target', 'OrderID', 'Status', 'Remarks']),
+    ("daily_summary_file", ['Date', 'RealizedPnL', 'UnrealizedPnL', 'TotalPnL',
+                            'CapitalStartOfDay', 'CapitalEndOfDay', 'TradesCount', 'WinningTrades', 'LosingTrades']),
+], ids=["trade_log", "daily_summary"])
+def test_01_initialize_header(shared_logger, attr, expected_header):
+    with open(getattr(shared_logger, attr), 'r') as f:
+        assert next(csv.reader(f)) == expected_header
 
-    def tearDown(self):
-        # Clean up created files after tests
-        if os.path.exists(self.test_trade_log_file):
-            os.remove(self.test_trade_log_file)
-        if os.path.exists(self.test_daily_summary_file):
-            os.remove(self.test_daily_summary_file)
 
-    def test_01_initialize_trade_log(self):
-        self.assertTrue(os.path.exists(self.test_trade_log_file))
-        with open(self.test_trade_log_file, 'r') as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            self.assertEqual(header, [
-                'Timestamp', 'Strategy', 'Symbol', 'Exchange', 
-                'Action', 'Quantity', 'Price', 'OrderType', 
-                'StopLoss', 'Target', 'OrderID', 'Status', 'Remarks'
-            ])
+def test_03_log_trade(fresh_logger, memory_files):
+    fresh_logger.log_trade(
+        strategy_name='TestStrategy', symbol='TEST', exchange='NSE', action='BUY',
+        quantity=10, price=100.0, order_type='LIMIT', order_id='ORDER001', status='EXECUTED'
+    )
+    log_entry = memory_files.rows(fresh_logger.trade_log_file)[1] # First row after the header
+    assert log_entry[0] == '2024-01-01 10:00:00.000' # Clock frozen in conftest.py
+    assert log_entry[1] == 'TestStrategy'
+    assert log_entry[2] == 'TEST'
+    assert log_entry[4] == 'BUY'
+    assert log_entry[10] == 'ORDER001'
 
-    def test_02_initialize_daily_summary(self):
-        self.assertTrue(os.path.exists(self.test_daily_summary_file))
-        with open(self.test_daily_summary_file, 'r') as f:
-            reader = csv.reader(f)
-            header = next(reader)
-            self.assertEqual(header, [
-                'Date', 'RealizedPnL', 'UnrealizedPnL', 'TotalPnL', 
-                'CapitalStartOfDay', 'CapitalEndOfDay', 'TradesCount', 'WinningTrades', 'LosingTrades'
-            ])
 
-    def test_03_log_trade(self):
-        self.logger.log_trade(
-            strategy_name='TestStrategy', symbol='TEST', exchange='NSE', action='BUY',
-            quantity=10, price=100.0, order_type='LIMIT', order_id='ORDER001', status='EXECUTED'
-        )
-        with open(self.test_trade_log_file, 'r') as f:
-            reader = csv.reader(f)
-            next(reader) # Skip header
-            log_entry = next(reader)
-            self.assertEqual(log_entry[1], 'TestStrategy')
-            self.assertEqual(log_entry[2], 'TEST')
-            self.assertEqual(log_entry[4], 'BUY')
-            self.assertEqual(log_entry[10], 'ORDER001')
+def test_04_log_daily_summary(fresh_logger, memory_files):
+    fresh_logger.log_daily_summary(
+        realized_pnl=100.0, unrealized_pnl=50.0, capital_start=10000, capital_end=10150,
+        trades_count=2, winning_trades=1, losing_trades=1
+    )
+    log_entry = memory_files.rows(fresh_logger.daily_summary_file)[1]
+    assert log_entry[1] == '100.0' # PnL
+    assert log_entry[4] == '10000' # Capital Start
 
-    def test_04_log_daily_summary(self):
-        self.logger.log_daily_summary(
-            realized_pnl=100.0, unrealized_pnl=50.0, capital_start=10000, capital_end=10150,
-            trades_count=2, winning_trades=1, losing_trades=1
-        )
-        with open(self.test_daily_summary_file, 'r') as f:
-            reader = csv.reader(f)
-            next(reader) # Skip header
-            log_entry = next(reader)
-            self.assertEqual(log_entry[1], '100.0') # PnL
-            self.assertEqual(log_entry[4], '10000') # Capital Start
 
-    def test_05_update_trade_status(self):
-        self.logger.log_trade( # First log a trade
-            strategy_name='TestStrategyUpd', symbol='TESTUPD', exchange='NSE', action='BUY',
-            quantity=5, price=200.0, order_type='MARKET', order_id='ORDER002', status='PLACED'
-        )
-        self.logger.update_trade_status(order_id='ORDER002', new_status='EXECUTED', remarks='Filled')
-        
-        with open(self.test_trade_log_file, 'r') as f:
-            lines = list(csv.reader(f))
-        
-        # Last entry should be the update
-        last_entry = lines[-1]
-        self.assertEqual(last_entry[1], 'SYSTEM_UPDATE') # strategy_name for updates
-        self.assertEqual(last_entry[10], 'ORDER002') # order_id
-        self.assertEqual(last_entry[11], 'EXECUTED') # new_status
-        self.assertIn('Filled', last_entry[12]) # remarks
+def test_05_update_trade_status(fresh_logger, memory_files):
+    fresh_logger.log_trade( # First log a trade
+        strategy_name='TestStrategyUpd', symbol='TESTUPD', exchange='NSE', action='BUY',
+        quantity=5, price=200.0, order_type='MARKET', order_id='ORDER002', status='PLACED'
+    )
+    fresh_logger.update_trade_status(order_id='ORDER002', new_status='EXECUTED', remarks='Filled')
 
-if __name__ == '__main__':
-    unittest.main()
+    # Last entry should be the update
+    last_entry = memory_files.last_row(fresh_logger.trade_log_file)
+    assert last_entry[1] == 'SYSTEM_UPDATE' # strategy_name for updates
+    assert last_entry[10] == 'ORDER002' # order_id
+    assert last_entry[11] == 'EXECUTED' # new_status
+    assert 'Filled' in last_entry[12] # remarks
+
+
+def test_06_log_trade_batch(fresh_logger, memory_files):
+    trades = [
+        dict(strategy_name='BatchStrategy', symbol='TESTA', exchange='BACKTEST', action='BUY',
+             quantity=10, price=100.0, order_type='MARKET', status='EXECUTED_BUY'),
+        dict(strategy_name='BatchStrategy', symbol='TESTA', exchange='BACKTEST', action='SELL',
+             quantity=10, price=105.0, order_type='MARKET', status='EXECUTED_CLOSE', remarks='Closed'),
+    ]
+    assert fresh_logger.log_trade_batch(trades)
+
+    lines = memory_files.rows(fresh_logger.trade_log_file)
+    assert len(lines) == 3 # Header + 2 rows
+    assert [row[4] for row in lines[1:]] == ['BUY', 'SELL']
+    assert lines[2][11] == 'EXECUTED_CLOSE'
+    assert lines[2][12] == 'Closed'
+    assert [row[0] for row in lines[1:]] == ['2024-01-01 10:00:00.000'] * 2 # No timestamp given: flush time
+
+
+def test_07_log_trade_batch_keeps_per_trade_timestamps(fresh_logger, memory_files):
+    trades = [
+        dict(strategy_name='BatchStrategy', symbol='TESTA', exchange='BACKTEST', action=action,
+             quantity=10, price=100.0, order_type='MARKET', timestamp=datetime(2023, 5, 1, 9, 15, second, 250000))
+        for action, second in (('BUY', 1), ('SELL', 2))
+    ]
+    assert fresh_logger.log_trade_batch(trades)
+    assert [row[0] for row in memory_files.rows(fresh_logger.trade_log_file)[1:]] == [
+        '2023-05-01 09:15:01.250', '2023-05-01 09:15:02.250'
+    ]
+    assert 'timestamp' in trades[0] # Caller's dicts are left as they were